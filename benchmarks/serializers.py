@@ -0,0 +1,98 @@
+"""
+Compare list serialization through ``ModelSerializer`` and the
+``values()``-based fast path.
+
+Run from the project root against the configured database:
+
+    python benchmarks/serializers.py --rows 5000
+
+Benchmark rows are created inside a transaction that is rolled back.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "meetingroom_api.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from bookings.models import Booking  # noqa: E402
+from bookings.serializers import BookingSerializer  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from meetingroom_api.fastpath import values_serializer_for  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rooms.models import Room  # noqa: E402
+from rooms.serializers import RoomSerializer  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+def populate(rows):
+    user = User.objects.create_user("benchmark-user")
+    rooms = Room.objects.bulk_create(
+        Room(name=f"benchmark room {i}", capacity=i % 20 + 1, floor=i % 10)
+        for i in range(rows)
+    )
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    Booking.objects.bulk_create(
+        Booking(
+            user=user,
+            room=rooms[i % len(rooms)],
+            start=today + timedelta(days=i // 8, hours=9 + i % 8),
+            end=today + timedelta(days=i // 8, hours=10 + i % 8),
+        )
+        for i in range(rows)
+    )
+
+
+def measure(label, serializer_class, queryset, repeat):
+    renderer = JSONRenderer()
+    values_serializer = values_serializer_for(serializer_class)
+
+    def model_path():
+        return renderer.render(serializer_class(queryset.all(), many=True).data)
+
+    def values_path():
+        rows = values_serializer.values(queryset.all())
+        return renderer.render(values_serializer.to_representation(rows))
+
+    assert model_path() == values_path(), f"{label}: outputs differ"
+    model_time = min(timeit.repeat(model_path, number=1, repeat=repeat))
+    values_time = min(timeit.repeat(values_path, number=1, repeat=repeat))
+    print(
+        f"{label:<10} ModelSerializer {model_time * 1000:9.1f} ms   "
+        f"values() {values_time * 1000:9.1f} ms   x{model_time / values_time:.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        with transaction.atomic():
+            populate(args.rows)
+            rooms = Room.objects.filter(name__startswith="benchmark room")
+            bookings = Booking.objects.filter(user__username="benchmark-user")
+            measure("rooms", RoomSerializer, rooms, args.repeat)
+            measure("bookings", BookingSerializer, bookings, args.repeat)
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == "__main__":
+    main()
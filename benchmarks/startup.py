@@ -0,0 +1,108 @@
+"""
+Measure worker cold start: ``django.setup()``, the WSGI application and the
+URLconf, as a worker has them before its first request.
+
+Each configuration runs in a fresh interpreter with ``python -X importtime``;
+the report shows the wall time (best of ``--repeat``), the total import time
+and the slowest top-level packages. By default the full configuration is
+compared with the admin and Swagger UI left out:
+
+    python benchmarks/startup.py --repeat 5
+    python benchmarks/startup.py --config lean=ADMIN_ENABLED=0,SWAGGER_UI_ENABLED=0
+
+No database connection is made.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+STARTUP = """
+import django
+django.setup()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+get_wsgi_application()
+get_resolver().url_patterns
+"""
+
+DEFAULT_CONFIGS = [
+    "full=ADMIN_ENABLED=1,SWAGGER_UI_ENABLED=1",
+    "lean=ADMIN_ENABLED=0,SWAGGER_UI_ENABLED=0",
+]
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_config(value):
+    name, _, assignments = value.partition("=")
+    env = dict(item.split("=", 1) for item in assignments.split(",") if item)
+    return name, env
+
+
+def run(env):
+    """Return ``(wall seconds, {module: self microseconds})`` of one start."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - started
+    modules = {}
+    for match in IMPORT_LINE.finditer(result.stderr):
+        modules[match.group(4)] = int(match.group(1))
+    return wall, modules
+
+
+def report(name, walls, modules, top):
+    by_package = defaultdict(int)
+    for module, self_us in modules.items():
+        by_package[module.split(".")[0]] += self_us
+    print(
+        f"{name}: wall {min(walls) * 1000:.0f} ms (best of {len(walls)}), "
+        f"imports {sum(modules.values()) / 1000:.0f} ms in {len(modules)} modules"
+    )
+    slowest = sorted(by_package.items(), key=lambda item: -item[1])[:top]
+    for package, self_us in slowest:
+        print(f"  {package:<32} {self_us / 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--config",
+        action="append",
+        dest="configs",
+        help="NAME=VAR=VALUE,... environment to start with (repeatable).",
+    )
+    parser.add_argument(
+        "--settings",
+        default=os.environ.get("DJANGO_SETTINGS_MODULE", "meetingroom_api.settings"),
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for config in args.configs or DEFAULT_CONFIGS:
+        name, overrides = parse_config(config)
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": args.settings, **overrides}
+        walls = []
+        for _ in range(args.repeat):
+            wall, modules = run(env)
+            walls.append(wall)
+        report(name, walls, modules, args.top)
+
+
+if __name__ == "__main__":
+    main()
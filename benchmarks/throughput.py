@@ -0,0 +1,193 @@
+"""
+Smoke-test request throughput of the development server against gunicorn
+with the production settings, on ``GET /api/rooms/`` and
+``POST /api/bookings/``.
+
+Run from the project root against the configured database:
+
+    python benchmarks/throughput.py --requests 500 --concurrency 8
+
+A staff user and rooms are created for the run and deleted afterwards.
+Throttling is relaxed in the servers started here.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import count
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "meetingroom_api.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from bookings.models import Booking, BookingChange  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from jobs.models import Job  # noqa: E402
+from rooms.models import Room  # noqa: E402
+
+USERNAME = "benchmark-throughput"
+PASSWORD = "benchmark-pass"
+
+SERVERS = {
+    "runserver": (
+        "meetingroom_api.settings",
+        [sys.executable, "manage.py", "runserver", "--noreload", "127.0.0.1:{port}"],
+    ),
+    "gunicorn": (
+        "meetingroom_api.settings_production",
+        [sys.executable, "-m", "gunicorn", "--bind", "127.0.0.1:{port}"],
+    ),
+}
+
+
+def populate(rooms):
+    user = User.objects.create_user(USERNAME, password=PASSWORD, is_staff=True)
+    Room.objects.bulk_create(
+        Room(name=f"{USERNAME} {i}", capacity=i % 20 + 1, floor=i % 10)
+        for i in range(rooms)
+    )
+    return user, list(
+        Room.objects.filter(name__startswith=USERNAME).values_list("id", flat=True)
+    )
+
+
+def cleanup():
+    Booking.objects.filter(user__username=USERNAME).delete()
+    user_ids = list(User.objects.filter(username=USERNAME).values_list("id", flat=True))
+    BookingChange.objects.filter(user_id__in=user_ids).delete()
+    Job.objects.filter(created_by_id__in=user_ids).delete()
+    Room.objects.filter(name__startswith=USERNAME).delete()
+    User.objects.filter(username=USERNAME).delete()
+
+
+def start_server(name, port):
+    settings_module, command = SERVERS[name]
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": settings_module,
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark"),
+        "ALLOWED_HOSTS": "127.0.0.1",
+        "THROTTLE_RATE_USER": "1000000/minute",
+        "THROTTLE_RATE_ANON": "1000000/minute",
+    }
+    process = subprocess.Popen(
+        [part.format(port=port) for part in command],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{base_url}/swagger.json", timeout=1)
+            return process, base_url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{name} did not start")
+
+
+def load(label, send, total, concurrency):
+    """Run ``send(session)`` ``total`` times and print throughput and latency."""
+    local = threading.local()
+
+    def timed(_):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        started = time.perf_counter()
+        response = send(local.session)
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = sorted(executor.map(timed, range(total)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"  {label:<20} {total / elapsed:8.1f} req/s"
+        f"  p50 {statistics.median(latencies) * 1000:6.1f} ms"
+        f"  p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:6.1f} ms"
+    )
+
+
+def run(name, port, room_ids, args):
+    process, base_url = start_server(name, port)
+    try:
+        token = requests.post(
+            f"{base_url}/api/auth/login/",
+            json={"username": USERNAME, "password": PASSWORD},
+        ).json()["access"]
+        headers = {"Authorization": f"Bearer {token}"}
+        print(f"{name}:")
+
+        def list_rooms(session):
+            return session.get(f"{base_url}/api/rooms/", headers=headers)
+
+        # The user's bookings must not overlap: each one takes the next
+        # half hour, in the next room.
+        slots = count()
+        lock = threading.Lock()
+        first_hour = timezone.now().replace(
+            minute=0, second=0, microsecond=0
+        ) + timedelta(days=1)
+
+        def create_booking(session):
+            with lock:
+                slot = next(slots)
+            start = first_hour + slot * timedelta(minutes=30)
+            return session.post(
+                f"{base_url}/api/bookings/",
+                json={
+                    "room": room_ids[slot % len(room_ids)],
+                    "start": start.isoformat(),
+                    "end": (start + timedelta(minutes=30)).isoformat(),
+                },
+                headers=headers,
+            )
+
+        load("GET /api/rooms/", list_rooms, args.requests, args.concurrency)
+        load("POST /api/bookings/", create_booking, args.requests, args.concurrency)
+    finally:
+        process.terminate()
+        process.wait()
+        Booking.objects.filter(user__username=USERNAME).delete()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--server", choices=list(SERVERS), action="append", dest="servers"
+    )
+    args = parser.parse_args()
+
+    cleanup()
+    _, room_ids = populate(args.rooms)
+    try:
+        for name in args.servers or list(SERVERS):
+            run(name, args.port, room_ids, args)
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
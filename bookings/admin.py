@@ -1,10 +1,53 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User
+from jobs.queue import enqueue
+from meetingroom_api.pagination import EstimatedCountPaginator
 
-from .models import Booking
+from .models import Booking, WaitlistEntry
 
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
-    list_display = ("room", "user", "date", "start_time", "end_time")
+    """
+    Tuned for tables of millions of bookings: the changelist is counted from
+    the planner's estimate, rows are read with their room and user in one
+    query, and the ``start`` filter is a range on the ``start`` index. There
+    is no date hierarchy, whose year links come from a DISTINCT over the
+    whole table, and no room filter, whose sidebar would list every room:
+    rooms are found by search, or by ``?room__id__exact=`` using the
+    ``(room, start, end)`` index.
+    """
+
+    list_display = ("id", "room", "user", "start", "end")
+    list_select_related = ("room", "user")
     search_fields = ("room__name", "user__username")
-    list_filter = ("date", "room")
+    list_filter = ("office", "start")
+    autocomplete_fields = ("room", "user")
+    paginator = EstimatedCountPaginator
+    # Skips the second, unfiltered COUNT(*) shown next to filtered results.
+    show_full_result_count = False
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ("room", "user", "start", "end", "created_at")
+    list_select_related = ("room", "user")
+    search_fields = ("room__name", "user__username")
+    list_filter = ("start",)
+    autocomplete_fields = ("room", "user")
+
+
+@admin.action(description="Delete selected users and their bookings in the background")
+def delete_users_in_background(modeladmin, request, queryset):
+    for user in queryset:
+        enqueue("users.delete", {"user_id": user.pk}, user=request.user)
+    modeladmin.message_user(request, f"Enqueued deletion of {len(queryset)} users.")
+
+
+class BookingUserAdmin(UserAdmin):
+    actions = [delete_users_in_background]
+
+
+admin.site.unregister(User)
+admin.site.register(User, BookingUserAdmin)
@@ -0,0 +1,88 @@
+"""
+iCalendar (RFC 5545) rendering of bookings.
+"""
+
+import json
+from datetime import timezone as dt_timezone
+
+from rest_framework.renderers import BaseRenderer
+
+CALENDAR_FIELDS = (
+    "id",
+    "start",
+    "end",
+    "updated_at",
+    "room__name",
+    "user_id",
+    "user__username",
+)
+
+
+class ICalendarRenderer(BaseRenderer):
+    """
+    Lets calendar clients negotiate ``text/calendar``. Feeds themselves are
+    streamed; only error payloads go through ``render``.
+    """
+
+    media_type = "text/calendar"
+    format = "ics"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, (bytes, str)):
+            return data
+        return json.dumps(data)
+
+
+def _escape(text):
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    """Fold content lines longer than 75 octets as required by RFC 5545."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Do not split inside a multi-byte UTF-8 sequence.
+        while cut and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+    parts.append(encoded.decode())
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_calendar(rows, name, summary):
+    """
+    Yield the lines of a VCALENDAR for ``rows`` (``CALENDAR_FIELDS`` tuples).
+    ``summary`` maps a row to the event summary.
+    """
+    yield _fold("BEGIN:VCALENDAR")
+    yield _fold("VERSION:2.0")
+    yield _fold("PRODID:-//Meeting Room Booking API//EN")
+    yield _fold("CALSCALE:GREGORIAN")
+    yield _fold(f"X-WR-CALNAME:{_escape(name)}")
+    for row in rows:
+        booking_id, start, end, updated_at, room_name = row[:5]
+        yield _fold("BEGIN:VEVENT")
+        yield _fold(f"UID:booking-{booking_id}@meetingroom-api")
+        yield _fold(f"DTSTAMP:{_utc(updated_at)}")
+        yield _fold(f"LAST-MODIFIED:{_utc(updated_at)}")
+        yield _fold(f"DTSTART:{_utc(start)}")
+        yield _fold(f"DTEND:{_utc(end)}")
+        yield _fold(f"SUMMARY:{_escape(summary(row))}")
+        yield _fold(f"LOCATION:{_escape(room_name)}")
+        yield _fold("END:VEVENT")
+    yield _fold("END:VCALENDAR")
@@ -0,0 +1,108 @@
+"""
+Counter rows derived from bookings: the occupancy rollups (``usage.py``) and
+the quota counters (``quotas.py``).
+
+A ``CounterDelta`` accumulates signed booking contributions per counter row
+and either adds them to the stored rows (``apply``) or, starting from no
+rows, creates them (``rebuild_counters``).
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+
+
+def _plus(value, other, sign=1):
+    """Add ``other`` to a counter value, element-wise for lists."""
+    if isinstance(value, list):
+        return [a + sign * b for a, b in zip(value, other)]
+    return value + sign * other
+
+
+def _changes(total):
+    return any(any(value) if isinstance(value, list) else value for value in total)
+
+
+class CounterDelta:
+    """
+    Accumulates signed contributions to ``model`` rows keyed by the values of
+    ``key_fields``. A total holds one value per field of ``fields``: an
+    integer, or a list of integers added element-wise.
+    """
+
+    model = None
+    key_fields = ()
+    fields = ()
+
+    def __init__(self):
+        self.totals = defaultdict(self.empty_total)
+
+    def empty_total(self):
+        return [0] * len(self.fields)
+
+    def add_total(self, key, *values, sign=1):
+        total = self.totals[key]
+        for i, value in enumerate(values):
+            total[i] = _plus(total[i], value, sign)
+
+    def keep(self, row):
+        """
+        Whether ``row`` still counts anything, or is to be deleted: by default
+        while any of its ``fields`` is nonzero.
+        """
+        return _changes([getattr(row, field) for field in self.fields])
+
+    def __bool__(self):
+        return any(_changes(total) for total in self.totals.values())
+
+    def rows(self):
+        """Unsaved rows holding the totals, for a rebuild."""
+        rows = (
+            self.model(
+                **dict(zip(self.key_fields, key)), **dict(zip(self.fields, total))
+            )
+            for key, total in self.totals.items()
+        )
+        return [row for row in rows if self.keep(row)]
+
+    def apply(self):
+        """Add the accumulated deltas to the stored rows."""
+        with transaction.atomic():
+            # Sorted keys keep row lock order consistent between writers.
+            for key, total in sorted(self.totals.items()):
+                # E.g. moves within a day change an hour histogram only.
+                if not _changes(total):
+                    continue
+                row, _ = self.model.objects.select_for_update().get_or_create(
+                    **dict(zip(self.key_fields, key))
+                )
+                for field, value in zip(self.fields, total):
+                    setattr(row, field, _plus(getattr(row, field), value))
+                if self.keep(row):
+                    row.save()
+                else:
+                    row.delete()
+
+
+def rebuild_counters(counters, rows, new_delta, group, chunk_size):
+    """
+    Replace the ``counters`` queryset with rows recomputed from ``rows``,
+    tuples of ``new_delta().add`` arguments ordered by ``group(row)``.
+    Deltas are flushed between groups, so memory is bounded by one group's
+    counters. Returns the number of rows created.
+    """
+    model = counters.model
+    created = 0
+    with transaction.atomic():
+        counters.delete()
+        delta = new_delta()
+        current = None
+        for row in rows.iterator(chunk_size=chunk_size):
+            if group(row) != current:
+                if len(delta.totals) >= chunk_size:
+                    created += len(model.objects.bulk_create(delta.rows()))
+                    delta = new_delta()
+                current = group(row)
+            delta.add(*row)
+        created += len(model.objects.bulk_create(delta.rows()))
+    return created
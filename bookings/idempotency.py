@@ -0,0 +1,126 @@
+"""
+``Idempotency-Key`` support for booking writes.
+
+The first request with a key claims it by inserting an ``IdempotencyKey``
+row; the unique ``(user, key)`` constraint settles concurrent requests.
+Its successful response is stored in the same transaction as the booking
+write and replayed to later requests with the key, which never reach the
+view. Failed requests release the key, so that they can be retried.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# Claims still in progress after this long belong to a request that died.
+ABANDONED_AFTER = timedelta(minutes=1)
+
+
+def fingerprint(request):
+    """Hash of the method, path and body, to detect keys reused elsewhere."""
+    data = request.data
+    if hasattr(data, "lists"):
+        data = dict(data.lists())
+    body = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(
+        f"{request.method} {request.path}\n{body}".encode()
+    ).hexdigest()
+
+
+def claim(user, key, digest):
+    """
+    Return ``(record, created)``, where ``created`` means this request owns
+    the key and has to run.
+    """
+    now = timezone.now()
+    record = IdempotencyKey.objects.filter(user=user, key=key).first()
+    if record is not None:
+        abandoned = (
+            record.status_code is None and record.created_at <= now - ABANDONED_AFTER
+        )
+        if record.expires_at > now and not abandoned:
+            return record, False
+        record.delete()
+    try:
+        with transaction.atomic():
+            record = IdempotencyKey.objects.create(
+                user=user,
+                key=key,
+                fingerprint=digest,
+                expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+            )
+        return record, True
+    except IntegrityError:
+        # Claimed by a concurrent request in the meantime.
+        return IdempotencyKey.objects.filter(user=user, key=key).first(), False
+
+
+def replay(record, digest):
+    if record is None or record.status_code is None:
+        return Response(
+            {"detail": f"A request with this {HEADER} is in progress."},
+            status=409,
+        )
+    if record.fingerprint != digest:
+        return Response(
+            {"detail": f"This {HEADER} was used for a different request."},
+            status=422,
+        )
+    response = Response(record.response, status=record.status_code)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+class IdempotencyMixin:
+    """Honour ``Idempotency-Key`` on ``create``, ``update`` and ``destroy``."""
+
+    def create(self, request, *args, **kwargs):
+        return self.idempotent(super().create, request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        return self.idempotent(super().update, request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        return self.idempotent(super().destroy, request, *args, **kwargs)
+
+    def idempotent(self, handler, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return handler(request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"detail": f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters."},
+                status=400,
+            )
+        digest = fingerprint(request)
+        record, created = claim(request.user, key, digest)
+        if not created:
+            return replay(record, digest)
+        try:
+            with transaction.atomic():
+                response = handler(request, *args, **kwargs)
+                if status.is_success(response.status_code):
+                    record.status_code = response.status_code
+                    record.response = response.data
+                    record.save(update_fields=["status_code", "response"])
+                    return response
+        except BaseException:
+            record.delete()
+            raise
+        record.delete()
+        return response
+
+
+def prune_keys():
+    """Delete expired keys."""
+    return IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()[0]
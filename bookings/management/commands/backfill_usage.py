@@ -0,0 +1,51 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from bookings.usage import rebuild_usage
+from jobs.queue import enqueue
+
+
+class Command(BaseCommand):
+    help = "Rebuild room occupancy rollups from bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--room",
+            type=int,
+            action="append",
+            dest="rooms",
+            help="Room id (repeatable).",
+        )
+        parser.add_argument("--date-from", type=date.fromisoformat)
+        parser.add_argument("--date-to", type=date.fromisoformat)
+        parser.add_argument("--chunk-size", type=int, default=10000)
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Enqueue the rebuild for run_workers instead of running it here.",
+        )
+
+    def handle(self, *args, **options):
+        if options["background"]:
+            job = enqueue(
+                "bookings.backfill_usage",
+                {
+                    "room_ids": options["rooms"],
+                    "date_from": options["date_from"] and str(options["date_from"]),
+                    "date_to": options["date_to"] and str(options["date_to"]),
+                },
+            )
+            if options["verbosity"]:
+                self.stdout.write(self.style.SUCCESS(f"Enqueued job {job.pk}"))
+            return
+        created = rebuild_usage(
+            room_ids=options["rooms"],
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+            chunk_size=options["chunk_size"],
+        )
+        if options["verbosity"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"Rebuilt {created} room usage rollups")
+            )
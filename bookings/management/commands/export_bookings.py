@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from bookings import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        "Export bookings (and optionally rooms) to CSV or Parquet in the format "
+        "read by import_bookings, streaming with constant memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Bookings output file.")
+        parser.add_argument("--rooms", help="Also export rooms to this file.")
+        parser.add_argument("--format", choices=transfer.FORMATS)
+        parser.add_argument("--chunk-size", type=int, default=50000)
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        chunk_size = options["chunk_size"]
+        if options["rooms"]:
+            path = options["rooms"]
+            exported = transfer.export_rows(
+                transfer.room_export_queryset(),
+                transfer.ROOM_COLUMNS,
+                path,
+                transfer.detect_format(path, options["format"]),
+                chunk_size,
+                self.progress,
+            )
+            self.progress(self.style.SUCCESS(f"Exported {exported} rooms to {path}"))
+        path = options["output"]
+        exported = transfer.export_rows(
+            transfer.booking_export_queryset(),
+            transfer.BOOKING_COLUMNS,
+            path,
+            transfer.detect_format(path, options["format"]),
+            chunk_size,
+            self.progress,
+        )
+        self.progress(self.style.SUCCESS(f"Exported {exported} bookings to {path}"))
+
+    def progress(self, message):
+        if self.verbosity:
+            self.stdout.write(message)
@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from bookings.sync import prune_changes
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete booking change log entries older than --days. Clients holding "
+        "older sync tokens get 410 Gone and must sync again without a token."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90)
+
+    def handle(self, *args, **options):
+        deleted = prune_changes(timedelta(days=options["days"]))
+        if options["verbosity"]:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} changes"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from bookings.idempotency import prune_keys
+
+
+class Command(BaseCommand):
+    help = "Delete expired Idempotency-Key records of booking writes."
+
+    def handle(self, *args, **options):
+        deleted = prune_keys()
+        if options["verbosity"]:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} keys"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from bookings.waitlist import prune_entries
+
+
+class Command(BaseCommand):
+    help = "Delete waitlist entries whose time slot has started."
+
+    def handle(self, *args, **options):
+        deleted = prune_entries()
+        if options["verbosity"]:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} entries"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from bookings.quotas import rebuild_quota_usage
+
+
+class Command(BaseCommand):
+    help = "Recompute per-user booking quota counters from bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="users",
+            help="User id (repeatable).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        created = rebuild_quota_usage(
+            user_ids=options["users"], chunk_size=options["chunk_size"]
+        )
+        if options["verbosity"]:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} quota counters"))
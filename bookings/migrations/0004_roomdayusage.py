@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:01
+
+import bookings.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0001_initial"),
+        ("bookings", "0003_alter_booking_options_alter_booking_unique_together"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RoomDayUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("booked_minutes", models.PositiveIntegerField(default=0)),
+                ("booking_count", models.PositiveIntegerField(default=0)),
+                (
+                    "hour_histogram",
+                    models.JSONField(default=bookings.models.empty_hour_histogram),
+                ),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="usage",
+                        to="rooms.room",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["date", "room"], name="bookings_ro_date_98550d_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="roomdayusage",
+            constraint=models.UniqueConstraint(
+                fields=("room", "date"), name="unique_room_day_usage"
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0004_roomdayusage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.CreateModel(
+            name="BookingChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("booking_id", models.BigIntegerField()),
+                ("room_id", models.BigIntegerField()),
+                ("user_id", models.BigIntegerField()),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("updated", "Updated"),
+                            ("deleted", "Deleted"),
+                        ],
+                        max_length=7,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user_id", "id"], name="bookings_bo_user_id_9eba2a_idx"
+                    ),
+                    models.Index(
+                        fields=["room_id", "id"], name="bookings_bo_room_id_8ab133_idx"
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="bookings_bo_created_59051b_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
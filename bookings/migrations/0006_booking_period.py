@@ -0,0 +1,93 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:17
+
+import bookings.models
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+# Existing dates and times were wall-clock values in settings.TIME_ZONE.
+FORWARD_SQL = """
+UPDATE bookings_booking SET
+    "start" = ("date" + start_time) AT TIME ZONE %(tz)s,
+    "end" = ("date" + end_time
+             + CASE WHEN end_time < start_time THEN interval '1 day'
+                    ELSE interval '0' END) AT TIME ZONE %(tz)s
+"""
+BACKWARD_SQL = """
+UPDATE bookings_booking SET
+    "date" = ("start" AT TIME ZONE %(tz)s)::date,
+    start_time = ("start" AT TIME ZONE %(tz)s)::time,
+    end_time = ("end" AT TIME ZONE %(tz)s)::time
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0005_booking_updated_at_bookingchange"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="start",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="booking",
+            name="end",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunSQL(
+            [(FORWARD_SQL, {"tz": settings.TIME_ZONE})],
+            [(BACKWARD_SQL, {"tz": settings.TIME_ZONE})],
+        ),
+        migrations.AlterField(
+            model_name="booking",
+            name="start",
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name="booking",
+            name="end",
+            field=models.DateTimeField(),
+        ),
+        migrations.RemoveIndex(
+            model_name="booking",
+            name="bookings_bo_room_id_23b661_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="booking",
+            name="bookings_bo_user_id_e6d3ff_idx",
+        ),
+        migrations.RemoveField(
+            model_name="booking",
+            name="date",
+        ),
+        migrations.RemoveField(
+            model_name="booking",
+            name="start_time",
+        ),
+        migrations.RemoveField(
+            model_name="booking",
+            name="end_time",
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["room", "start", "end"], name="bookings_bo_room_id_ce30f3_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["user", "start", "end"], name="bookings_bo_user_id_e5227f_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=django.contrib.postgres.indexes.GistIndex(
+                bookings.models.TsTzRange("start", "end"), name="bookings_period_gist"
+            ),
+        ),
+    ]
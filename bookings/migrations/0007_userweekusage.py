@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("bookings", "0006_booking_period"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserWeekUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("week", models.DateField()),
+                ("booked_minutes", models.PositiveIntegerField(default=0)),
+                ("booking_count", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="week_usage",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="userweekusage",
+            constraint=models.UniqueConstraint(
+                fields=("user", "week"), name="unique_user_week_usage"
+            ),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:39
+
+import bookings.models
+from django.conf import settings
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("rooms", "0002_room_timezone"),
+        ("bookings", "0008_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WaitlistEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start", models.DateTimeField()),
+                ("end", models.DateTimeField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist",
+                        to="rooms.room",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["room", "start", "end"],
+                        name="bookings_wa_room_id_66ba3f_idx",
+                    ),
+                    django.contrib.postgres.indexes.GistIndex(
+                        bookings.models.TsTzRange("start", "end"),
+                        name="waitlist_period_gist",
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="waitlistentry",
+            constraint=models.UniqueConstraint(
+                fields=("user", "room", "start", "end"), name="unique_waitlist_entry"
+            ),
+        ),
+    ]
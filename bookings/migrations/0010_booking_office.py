@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("offices", "0001_initial"),
+        ("bookings", "0009_waitlistentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="office",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="offices.office",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["office", "start", "end"], name="bookings_bo_office__121539_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0010_booking_office"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(fields=["start"], name="bookings_bo_start_37bcf5_idx"),
+        ),
+    ]
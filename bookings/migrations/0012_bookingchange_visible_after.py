@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 18:09
+
+import bookings.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0011_booking_start_index"),
+    ]
+
+    operations = [
+        # Existing changes are committed: visible to any snapshot.
+        migrations.AddField(
+            model_name="bookingchange",
+            name="visible_after",
+            field=models.BigIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name="bookingchange",
+            name="visible_after",
+            field=models.BigIntegerField(
+                default=bookings.models.NextTxid, editable=False
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookingchange",
+            index=models.Index(
+                fields=["visible_after"], name="bookings_bo_visible_925b06_idx"
+            ),
+        ),
+    ]
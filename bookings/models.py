@@ -1,22 +1,274 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
 from django.conf import settings
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.contrib.postgres.indexes import GistIndex
 from django.db import models
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
 from rooms.models import Room
 
 
+class TsTzRange(models.Func):
+    """``tstzrange(start, end)``: the half-open ``[start, end)`` range."""
+
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+def local_period(day, start_time, end_time, tz):
+    """
+    Return the aware ``(start, end)`` of a wall-clock window on ``day`` in
+    ``tz``. An ``end_time`` before ``start_time`` ends on the next day.
+    """
+    start = datetime.combine(day, start_time, tzinfo=tz)
+    end_day = day + timedelta(days=1) if end_time < start_time else day
+    return start, datetime.combine(end_day, end_time, tzinfo=tz)
+
+
+def utc_midnight(day):
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+class PeriodQuerySet(models.QuerySet):
+    """Queries over models with ``start``/``end`` and a GiST period index."""
+
+    def with_period(self):
+        return self.alias(period=TsTzRange("start", "end"))
+
+    def overlapping(self, start, end):
+        """
+        Rows overlapping ``[start, end)``, matched with ``&&`` on the same
+        expression as the GiST index.
+        """
+        return self.with_period().filter(period__overlap=DateTimeTZRange(start, end))
+
+
+class BookingQuerySet(PeriodQuerySet):
+    def overlapping_local(self, day, start_time, end_time, timezones):
+        """
+        Bookings overlapping a wall-clock window, read in the time zone of
+        each booking's room (one of ``timezones``).
+        """
+        condition = models.Q()
+        for tz in timezones:
+            start, end = local_period(day, start_time, end_time, ZoneInfo(tz))
+            condition |= models.Q(
+                room__timezone=tz, period__overlap=DateTimeTZRange(start, end)
+            )
+        if not condition:
+            return self.none()
+        return self.with_period().filter(condition)
+
+
 class Booking(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="bookings"
     )
     room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="bookings")
+    # The room's office, copied on save so that office-scoped queries lead
+    # with it instead of joining rooms.
+    office = models.ForeignKey(
+        "offices.Office",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+        db_index=False,
+    )
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["room", "start", "end"]),
+            models.Index(fields=["user", "start", "end"]),
+            models.Index(fields=["office", "start", "end"]),
+            # Min/Max and ranges of ``start`` for the admin's date hierarchy.
+            models.Index(fields=["start"]),
+            # Serves ``&&`` overlap queries; see ``BookingQuerySet.overlapping``.
+            GistIndex(TsTzRange("start", "end"), name="bookings_period_gist"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.office_id = self.room.office_id
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.room.name} booked by {self.user.username} from {self.start} to {self.end}"
+
+    def local_start(self):
+        return self.start.astimezone(self.room.tzinfo)
+
+    def local_end(self):
+        return self.end.astimezone(self.room.tzinfo)
+
+
+class WaitlistEntry(models.Model):
+    """
+    A request for ``room`` from ``start`` to ``end`` while it is booked. When
+    an overlapping booking is deleted or shrunk, the oldest entries that fit
+    are booked; see ``bookings.waitlist``.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="waitlist"
+    )
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="waitlist")
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = PeriodQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "room", "start", "end"], name="unique_waitlist_entry"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["room", "start", "end"]),
+            # Serves the ``&&`` match against freed periods on cancellations.
+            GistIndex(TsTzRange("start", "end"), name="waitlist_period_gist"),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.user} waiting for {self.room.name} from {self.start} to {self.end}"
+        )
+
+
+def empty_hour_histogram():
+    return [0] * 24
+
+
+class RoomDayUsage(models.Model):
+    """
+    Per-room, per-day occupancy rollup maintained from ``Booking`` changes.
+
+    ``hour_histogram`` holds the booked minutes within each hour of the day.
+    """
+
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="usage")
     date = models.DateField()
-    start_time = models.TimeField()
-    end_time = models.TimeField()
+    booked_minutes = models.PositiveIntegerField(default=0)
+    booking_count = models.PositiveIntegerField(default=0)
+    hour_histogram = models.JSONField(default=empty_hour_histogram)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["room", "date"], name="unique_room_day_usage"
+            ),
+        ]
+        indexes = [models.Index(fields=["date", "room"])]
+
+    def __str__(self):
+        return f"{self.room.name} on {self.date}: {self.booked_minutes} minutes"
+
+
+class UserWeekUsage(models.Model):
+    """
+    Per-user, per-week (UTC, starting Monday) booked minutes and bookings,
+    maintained from ``Booking`` changes for quota checks. A booking counts
+    towards the week it starts in.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="week_usage"
+    )
+    week = models.DateField()
+    booked_minutes = models.PositiveIntegerField(default=0)
+    booking_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "week"], name="unique_user_week_usage"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} in week of {self.week}: {self.booked_minutes} minutes"
+
+
+class NextTxid(models.Func):
+    """
+    The first transaction id not yet assigned: every transaction that could
+    hold a lower change id has an id below it.
+    """
+
+    template = "txid_snapshot_xmax(txid_current_snapshot())"
+    output_field = models.BigIntegerField()
+
+
+class BookingChange(models.Model):
+    """
+    Append-only change log of bookings. The id of the latest change a client
+    has seen is its sync token; deleted bookings stay here as tombstones.
+
+    ``visible_after`` orders changes by commit visibility: once no transaction
+    below it is running, every change with a lower id is committed or gone.
+    A change must be written by a transaction that already has an id, e.g.
+    after writing its booking, so that the id is below every later
+    ``visible_after``.
+    """
+
+    class Action(models.TextChoices):
+        CREATED = "created"
+        UPDATED = "updated"
+        DELETED = "deleted"
+
+    booking_id = models.BigIntegerField()
+    room_id = models.BigIntegerField()
+    user_id = models.BigIntegerField()
+    action = models.CharField(max_length=7, choices=Action.choices)
+    created_at = models.DateTimeField(auto_now_add=True)
+    visible_after = models.BigIntegerField(default=NextTxid, editable=False)
 
     class Meta:
         indexes = [
-            models.Index(fields=["room", "date", "start_time", "end_time"]),
-            models.Index(fields=["user", "date", "start_time", "end_time"]),
+            models.Index(fields=["user_id", "id"]),
+            models.Index(fields=["room_id", "id"]),
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["visible_after"]),
+        ]
+
+    def __str__(self):
+        return f"Booking {self.booking_id} {self.action}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    First response to a booking write sent with an ``Idempotency-Key``
+    header, replayed to retries with the same key. ``status_code`` is null
+    while the first request is in progress.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="unique_user_idempotency_key"
+            ),
         ]
+        indexes = [models.Index(fields=["expires_at"])]
 
     def __str__(self):
-        return f"{self.room.name} booked by {self.user.username} on {self.date} from {self.start_time} to {self.end_time}"
+        return f"{self.key} of {self.user}"
@@ -0,0 +1,117 @@
+"""
+Per-user booking quotas: booked hours per week, upcoming bookings and how
+far ahead bookings may start (``BOOKING_MAX_*`` settings).
+
+Checks read the user's ``UserWeekUsage`` counters instead of aggregating
+bookings. Counters are maintained from ``Booking`` signals like the
+occupancy rollups and can be rebuilt with ``rebuild_quota_usage``.
+"""
+
+from datetime import timedelta, timezone as dt_timezone
+from operator import itemgetter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .counters import CounterDelta, rebuild_counters
+from .models import Booking, UserWeekUsage, utc_midnight
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+def week_start(value):
+    day = value.astimezone(dt_timezone.utc).date()
+    return day - timedelta(days=day.weekday())
+
+
+def week_minutes(start, end):
+    """Return ``{week: minutes}`` for ``[start, end)`` split at UTC weeks."""
+    minutes = {}
+    while start < end:
+        week = week_start(start)
+        boundary = min(end, utc_midnight(week + timedelta(days=7)))
+        minutes[week] = (boundary - start) // timedelta(minutes=1)
+        start = boundary
+    return minutes
+
+
+class QuotaDelta(CounterDelta):
+    """Accumulates signed booking contributions keyed by ``(user_id, week)``."""
+
+    model = UserWeekUsage
+    key_fields = ("user_id", "week")
+    fields = ("booked_minutes", "booking_count")
+
+    def add(self, user_id, start, end, sign=1):
+        weeks = week_minutes(start, end)
+        if not weeks:
+            return
+        for week, minutes in weeks.items():
+            self.add_total((user_id, week), minutes, 0, sign=sign)
+        self.add_total((user_id, week_start(start)), 0, 1, sign=sign)
+
+    def keep(self, usage):
+        return usage.booked_minutes > 0 or usage.booking_count > 0
+
+
+def check_quota(user, start, end, previous=None):
+    """
+    Raise ``QuotaExceeded`` if booking ``[start, end)`` would take ``user``
+    over a quota. ``previous`` is the ``(start, end)`` of the booking being
+    updated, whose share is discounted. Must run in the transaction that
+    saves the booking.
+
+    Upcoming bookings are those starting in the current week or later.
+    """
+    # Serializes the checks and counter updates of this user's bookings.
+    get_user_model().objects.select_for_update().filter(pk=user.pk).first()
+    now = timezone.now()
+    max_lead_days = settings.BOOKING_MAX_LEAD_DAYS
+    if max_lead_days and start > now + timedelta(days=max_lead_days):
+        raise QuotaExceeded(f"Bookings can start at most {max_lead_days} days ahead.")
+
+    delta = QuotaDelta()
+    delta.add(user.pk, start, end)
+    if previous is not None:
+        delta.add(user.pk, *previous, sign=-1)
+    weeks = {week: totals for (_, week), totals in delta.totals.items()}
+    current_week = week_start(now)
+    usage = list(
+        UserWeekUsage.objects.filter(
+            user=user, week__gte=min(current_week, *weeks)
+        ).values_list("week", "booked_minutes", "booking_count")
+    )
+    minutes = {week: booked for week, booked, _ in usage}
+
+    max_hours = settings.BOOKING_MAX_HOURS_PER_WEEK
+    if max_hours:
+        for week, (added, _) in weeks.items():
+            if added > 0 and minutes.get(week, 0) + added > max_hours * 60:
+                raise QuotaExceeded(
+                    f"At most {max_hours} hours can be booked per week "
+                    f"(week of {week})."
+                )
+
+    max_upcoming = settings.BOOKING_MAX_UPCOMING
+    added = sum(count for week, (_, count) in weeks.items() if week >= current_week)
+    if max_upcoming and added > 0:
+        upcoming = sum(count for week, _, count in usage if week >= current_week)
+        if upcoming + added > max_upcoming:
+            raise QuotaExceeded(
+                f"At most {max_upcoming} upcoming bookings are allowed."
+            )
+
+
+def rebuild_quota_usage(user_ids=None, chunk_size=10000):
+    """Recompute quota counters from ``Booking`` for the given users."""
+    bookings = Booking.objects.all()
+    usage = UserWeekUsage.objects.all()
+    if user_ids is not None:
+        bookings = bookings.filter(user_id__in=user_ids)
+        usage = usage.filter(user_id__in=user_ids)
+
+    rows = bookings.order_by("user_id", "start").values_list("user_id", "start", "end")
+    return rebuild_counters(usage, rows, QuotaDelta, itemgetter(0), chunk_size)
@@ -1,11 +1,120 @@
+from zoneinfo import ZoneInfo
+
 from rest_framework import serializers
+from rooms.models import Room
+
+from .models import Booking, WaitlistEntry, local_period
+
+LOCAL_FIELDS = ("date", "start_time", "end_time")
+
+
+class LocalPartField(serializers.Field):
+    """
+    ``date``, ``start_time`` or ``end_time`` of a booking, read in its room's
+    time zone. Written values are passed on to ``BookingSerializer.validate``,
+    which turns them into ``start``/``end``.
+    """
+
+    values_sources = ("start", "end", "room__timezone")
+
+    def __init__(self, part, **kwargs):
+        self.part = part
+        self.parser = (
+            serializers.DateField() if part == "date" else serializers.TimeField()
+        )
+        super().__init__(source="*", required=False, **kwargs)
+
+    def to_internal_value(self, data):
+        return {self.part: self.parser.to_internal_value(data)}
+
+    def to_representation(self, booking):
+        return self.from_values(booking.start, booking.end, booking.room.timezone)
 
-from .models import Booking
+    def from_values(self, start, end, timezone):
+        value = (end if self.part == "end_time" else start).astimezone(
+            ZoneInfo(timezone)
+        )
+        if self.part == "date":
+            return value.date().isoformat()
+        return value.time().isoformat()
 
 
 class BookingSerializer(serializers.ModelSerializer):
+    """
+    Bookings are stored as absolute ``start``/``end`` datetimes. Clients may
+    instead send ``date``, ``start_time`` and ``end_time`` in the room's time
+    zone, as before; responses carry both.
+    """
+
     room_name = serializers.ReadOnlyField(source="room.name")
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    date = LocalPartField("date")
+    start_time = LocalPartField("start_time")
+    end_time = LocalPartField("end_time")
 
     class Meta:
         model = Booking
-        fields = ["id", "room", "room_name", "date", "start_time", "end_time"]
+        fields = [
+            "id",
+            "room",
+            "room_name",
+            "start",
+            "end",
+            "date",
+            "start_time",
+            "end_time",
+        ]
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if "office_id" in self.context:
+            # Rooms of other offices, or being deleted, are reported as not
+            # existing.
+            fields["room"].queryset = Room.objects.filter(
+                office_id=self.context["office_id"], deleting=False
+            )
+        return fields
+
+    def validate(self, attrs):
+        local = {name: attrs.pop(name) for name in LOCAL_FIELDS if name in attrs}
+        if local:
+            if "start" in attrs or "end" in attrs:
+                raise serializers.ValidationError(
+                    "Use either start/end or date/start_time/end_time."
+                )
+            attrs["start"], attrs["end"] = self._local_period(attrs, local)
+        elif self.instance is None and not ("start" in attrs and "end" in attrs):
+            raise serializers.ValidationError(
+                "Either start and end or date, start_time and end_time are required."
+            )
+
+        start = attrs.get("start", getattr(self.instance, "start", None))
+        end = attrs.get("end", getattr(self.instance, "end", None))
+        if start >= end:
+            raise serializers.ValidationError("start must be before end.")
+        return attrs
+
+    def _local_period(self, attrs, local):
+        room = attrs.get("room") or self.instance.room
+        tz = room.tzinfo
+        if self.instance is not None:
+            # Partial updates keep the parts that were not sent.
+            current_start = self.instance.start.astimezone(tz)
+            local.setdefault("date", current_start.date())
+            local.setdefault("start_time", current_start.time())
+            local.setdefault("end_time", self.instance.end.astimezone(tz).time())
+        missing = [name for name in LOCAL_FIELDS if name not in local]
+        if missing:
+            raise serializers.ValidationError(
+                {name: ["This field is required."] for name in missing}
+            )
+        if local["start_time"] == local["end_time"]:
+            raise serializers.ValidationError("start_time must differ from end_time.")
+        return local_period(local["date"], local["start_time"], local["end_time"], tz)
+
+
+class WaitlistEntrySerializer(BookingSerializer):
+    class Meta:
+        model = WaitlistEntry
+        fields = BookingSerializer.Meta.fields + ["created_at"]
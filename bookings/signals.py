@@ -0,0 +1,178 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from rooms.models import Room
+
+from .models import Booking, BookingChange
+from .quotas import QuotaDelta
+from .usage import UsageDelta
+from .waitlist import freed_periods, promote
+
+# The user followed by the room and period; see ``_snapshot``.
+SNAPSHOT_FIELDS = ("user_id", "room_id", "start", "end")
+
+_suspended = ContextVar("booking_signals_suspended", default=False)
+
+
+@contextmanager
+def suspended():
+    """
+    Skip signal-driven rollup, quota counter and change log maintenance and
+    waitlist promotion, for batch writers that do them once per batch instead.
+    """
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def _snapshot(instance):
+    """Return the tracked booking values normalized to Python types."""
+    return tuple(
+        Booking._meta.get_field(name).to_python(getattr(instance, name))
+        for name in SNAPSHOT_FIELDS
+    )
+
+
+def _timezones(instance, *room_ids):
+    """Map ``room_ids`` to their time zones, reusing a cached ``instance.room``."""
+    timezones = {}
+    if Booking.room.is_cached(instance):
+        timezones[instance.room_id] = instance.room.timezone
+    missing = set(room_ids) - timezones.keys()
+    if missing:
+        timezones.update(
+            Room.objects.filter(pk__in=missing).values_list("id", "timezone")
+        )
+    return timezones
+
+
+def _add_usage(delta, timezones, snapshot, sign=1):
+    _, room_id, start, end = snapshot
+    delta.add(room_id, start, end, timezones[room_id], sign)
+
+
+def _quota_key(snapshot):
+    user_id, _, start, end = snapshot
+    return user_id, start, end
+
+
+def _log_changes(changes):
+    """
+    Append ``changes`` to the change log. Their transaction must have an id
+    before they take theirs (see ``BookingChange``): the booking write gives
+    it one, unless the booking was saved in autocommit mode.
+    """
+    if not connection.get_autocommit():
+        BookingChange.objects.bulk_create(changes)
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT txid_current()")
+        BookingChange.objects.bulk_create(changes)
+
+
+@receiver(post_init, sender=Booking)
+def remember_snapshot(sender, instance, **kwargs):
+    # Deferred fields would cost a query each; pre_save loads them if needed.
+    if instance.pk is None or instance.get_deferred_fields() & set(SNAPSHOT_FIELDS):
+        instance._snapshot = None
+    else:
+        instance._snapshot = _snapshot(instance)
+
+
+@receiver(pre_save, sender=Booking)
+def load_snapshot(sender, instance, **kwargs):
+    if instance.pk is not None and getattr(instance, "_snapshot", None) is None:
+        instance._snapshot = (
+            Booking.objects.filter(pk=instance.pk).values_list(*SNAPSHOT_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=Booking)
+def track_save(sender, instance, created, **kwargs):
+    if _suspended.get():
+        return
+    current = _snapshot(instance)
+    previous = None if created else instance._snapshot
+    instance._snapshot = current
+
+    changes = []
+    if previous is None:
+        changes.append((BookingChange.Action.CREATED, current))
+    else:
+        if previous[:2] != current[:2]:
+            # Moved to another user or room: clear it from the old feeds.
+            changes.append((BookingChange.Action.DELETED, previous))
+        changes.append((BookingChange.Action.UPDATED, current))
+    _log_changes(
+        [
+            BookingChange(
+                booking_id=instance.pk,
+                user_id=user_id,
+                room_id=room_id,
+                action=action,
+            )
+            for action, (user_id, room_id, *_) in changes
+        ]
+    )
+
+    if previous is not None and previous[1:] != current[1:]:
+        # Before the counter updates, so that the room is locked first.
+        promote(previous[1], freed_periods(previous[1:], current[1:]))
+
+    if previous != current:
+        delta = UsageDelta()
+        if previous is not None:
+            timezones = _timezones(instance, previous[1], current[1])
+            _add_usage(delta, timezones, previous, sign=-1)
+        else:
+            timezones = _timezones(instance, current[1])
+        _add_usage(delta, timezones, current)
+        delta.apply()
+
+    if previous is None or _quota_key(previous) != _quota_key(current):
+        quotas = QuotaDelta()
+        if previous is not None:
+            quotas.add(*_quota_key(previous), sign=-1)
+        quotas.add(*_quota_key(current))
+        quotas.apply()
+
+
+def _deleted_directly(origin):
+    """Whether a delete started from bookings rather than their room or user."""
+    if isinstance(origin, QuerySet):
+        return origin.model is Booking
+    return isinstance(origin, Booking)
+
+
+@receiver(post_delete, sender=Booking)
+def track_delete(sender, instance, origin=None, **kwargs):
+    if _suspended.get():
+        return
+    previous = getattr(instance, "_snapshot", None) or _snapshot(instance)
+    instance._snapshot = None
+    user_id, room_id, start, end = previous
+    if _deleted_directly(origin):
+        promote(room_id, [(start, end)])
+    _log_changes(
+        [
+            BookingChange(
+                booking_id=instance.pk,
+                user_id=user_id,
+                room_id=room_id,
+                action=BookingChange.Action.DELETED,
+            )
+        ]
+    )
+    delta = UsageDelta()
+    _add_usage(delta, _timezones(instance, room_id), previous, sign=-1)
+    delta.apply()
+    quotas = QuotaDelta()
+    quotas.add(*_quota_key(previous), sign=-1)
+    quotas.apply()
@@ -0,0 +1,95 @@
+"""
+Incremental booking sync backed by the ``BookingChange`` log.
+
+A sync token is the id of the last change a client has seen. Change ids are
+handed out before their transaction commits, so a change may become visible
+after higher ids already were. Tokens therefore stop below the first change
+that is not yet settled: one whose ``visible_after`` is above a transaction
+that is still running. Nothing below the returned bound can appear later.
+"""
+
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import BookingChange
+
+# The oldest running transaction other than our own, or the next transaction
+# id when none is running.
+HORIZON_SQL = (
+    "COALESCE((SELECT MIN(xip) FROM txid_snapshot_xip(txid_current_snapshot()) "
+    "AS xip), txid_snapshot_xmax(txid_current_snapshot()))"
+)
+
+
+class SyncTokenExpired(Exception):
+    pass
+
+
+def _settled_bound():
+    """
+    Return an id below which every change is committed and visible: the
+    first unsettled change, or one past the latest change. Computed in one
+    statement, so that both parts see the same snapshot.
+    """
+    quote_name = connection.ops.quote_name
+    table = quote_name(BookingChange._meta.db_table)
+    visible_after = quote_name(BookingChange._meta.get_field("visible_after").column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COALESCE("
+            f"(SELECT MIN(id) FROM {table} WHERE {visible_after} > {HORIZON_SQL}), "
+            f"(SELECT MAX(id) FROM {table}) + 1, 1)"
+        )
+        return cursor.fetchone()[0]
+
+
+def _latest_below(bound):
+    return BookingChange.objects.filter(id__lt=bound).aggregate(token=Max("id"))[
+        "token"
+    ]
+
+
+def current_token():
+    """Token for a full sync: the latest settled change."""
+    return _latest_below(_settled_bound()) or 0
+
+
+def changes_since(changes, token, limit):
+    """
+    Return ``(next_token, upserted_ids, deleted_ids, has_more)`` for the
+    ``changes`` queryset after ``token``, collapsed to one action per booking.
+    Tokens no longer in the log, including 0, raise ``SyncTokenExpired``.
+    """
+    if not BookingChange.objects.filter(pk=token).exists():
+        raise SyncTokenExpired
+
+    bound = _settled_bound()
+    pending = changes.filter(id__gt=token, id__lt=bound)
+
+    rows = list(
+        pending.order_by("id").values_list("id", "booking_id", "action")[: limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    latest = {booking_id: action for _, booking_id, action in rows}
+    deleted_action = BookingChange.Action.DELETED
+    upserted = [b for b, action in latest.items() if action != deleted_action]
+    deleted = [b for b, action in latest.items() if action == deleted_action]
+    if has_more:
+        next_token = rows[-1][0]
+    else:
+        # Skip past settled changes outside of ``changes`` too.
+        next_token = max(_latest_below(bound) or token, token)
+    return next_token, upserted, deleted, has_more
+
+
+def prune_changes(older_than):
+    """
+    Delete changes older than ``older_than``, always keeping the newest one so
+    that the current token stays valid.
+    """
+    newest = BookingChange.objects.aggregate(token=Max("id"))["token"] or 0
+    return BookingChange.objects.filter(
+        id__lt=newest, created_at__lt=timezone.now() - older_than
+    ).delete()[0]
@@ -0,0 +1,108 @@
+from collections import defaultdict
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.mail import send_mail
+from django.db import transaction
+from jobs.queue import register
+
+from .models import Booking, BookingChange, WaitlistEntry
+from .quotas import QuotaDelta
+from .signals import suspended
+from .usage import USAGE_FIELDS, UsageDelta, rebuild_usage
+from .waitlist import promote
+
+DELETE_BATCH_SIZE = 1000
+
+
+def delete_bookings(queryset, batch_size=DELETE_BATCH_SIZE, job=None):
+    """
+    Delete the bookings of ``queryset`` in batches, one transaction per batch,
+    promoting waitlist entries and writing rollup and quota deltas and change
+    log tombstones once per batch.
+    """
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.order_by().values_list("pk", "user_id", *USAGE_FIELDS)[
+                    :batch_size
+                ]
+            )
+            if not rows:
+                return deleted
+            delta = UsageDelta()
+            quotas = QuotaDelta()
+            freed = defaultdict(list)
+            for _, user_id, room_id, start, end, tz in rows:
+                delta.add(room_id, start, end, tz, sign=-1)
+                quotas.add(user_id, start, end, sign=-1)
+                freed[room_id].append((start, end))
+            with suspended():
+                Booking.objects.filter(pk__in=[row[0] for row in rows]).delete()
+            # Rooms are locked before the counters, as by booking writes.
+            for room_id, periods in sorted(freed.items()):
+                promote(room_id, periods)
+            delta.apply()
+            quotas.apply()
+            BookingChange.objects.bulk_create(
+                BookingChange(
+                    booking_id=pk,
+                    user_id=user_id,
+                    room_id=room_id,
+                    action=BookingChange.Action.DELETED,
+                )
+                for pk, user_id, room_id, *_ in rows
+            )
+        deleted += len(rows)
+        if job is not None:
+            job.report_progress(deleted_bookings=deleted)
+
+
+@register("users.delete")
+def delete_user(job):
+    user_id = job.payload["user_id"]
+    WaitlistEntry.objects.filter(user_id=user_id).delete()
+    deleted = delete_bookings(
+        Booking.objects.filter(user_id=user_id),
+        job.payload.get("batch_size", DELETE_BATCH_SIZE),
+        job,
+    )
+    User.objects.filter(pk=user_id).delete()
+    return {"deleted_bookings": deleted}
+
+
+@register("bookings.backfill_usage")
+def backfill_usage(job):
+    dates = {
+        param: date.fromisoformat(job.payload[param])
+        for param in ("date_from", "date_to")
+        if job.payload.get(param)
+    }
+    created = rebuild_usage(room_ids=job.payload.get("room_ids"), **dates)
+    return {"rollups": created}
+
+
+def notification_payload(booking, event):
+    return {
+        "event": event,
+        "user_id": booking.user_id,
+        "room_name": booking.room.name,
+        "start": booking.local_start().isoformat(),
+        "end": booking.local_end().isoformat(),
+    }
+
+
+@register("bookings.notify")
+def notify(job):
+    payload = job.payload
+    user = User.objects.filter(pk=payload["user_id"]).first()
+    if user is None or not user.email:
+        return {"sent": 0}
+    subject = f"Booking {payload['event']}: {payload['room_name']}"
+    message = (
+        f"Your booking of {payload['room_name']} "
+        f"from {payload['start']} to {payload['end']} "
+        f"has been {payload['event']}."
+    )
+    return {"sent": send_mail(subject, message, None, [user.email])}
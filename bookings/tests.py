@@ -1,15 +1,51 @@
+import csv
+import os
+import tempfile
+import threading
 from concurrent.futures import ThreadPoolExecutor
-from datetime import date
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
 
 import requests
 from django.contrib.auth.models import User
-from django.test import LiveServerTestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from jobs.models import Job
+from meetingroom_api.fastpath import values_serializer_for
+from meetingroom_api.pagination import EstimatedCountPaginator
+from offices.tokens import OfficeTokenObtainPairSerializer
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 from rooms.models import Room
 
-from .models import Booking
+from .models import (
+    Booking,
+    BookingChange,
+    IdempotencyKey,
+    RoomDayUsage,
+    UserWeekUsage,
+    WaitlistEntry,
+    local_period,
+    utc_midnight,
+)
+from .serializers import BookingSerializer
+from .sync import changes_since, current_token
+from .usage import USAGE_FIELDS, UsageDelta, rebuild_usage
+
+
+def period(day, start_time, end_time, tz=dt_timezone.utc):
+    """``start``/``end`` keyword arguments for a wall-clock window in ``tz``."""
+    if isinstance(start_time, str):
+        start_time = time.fromisoformat(start_time.zfill(5))
+        end_time = time.fromisoformat(end_time.zfill(5))
+    start, end = local_period(day, start_time, end_time, tz)
+    return {"start": start, "end": end}
 
 
 class BookingAPITests(APITestCase):
@@ -39,13 +75,59 @@ class BookingAPITests(APITestCase):
         response = self.client.post(self.booking_url, data)
         self.assertEqual(response.status_code, 400)
 
+    def test_local_fields_follow_room_time_zone(self):
+        self.room.timezone = "Europe/Berlin"
+        self.room.save()
+        self.client.force_authenticate(user=self.user1)
+        data = {**self.data, "date": "2025-01-15"}
+        response = self.client.post(self.booking_url, data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["start"], "2025-01-15T09:00:00Z")
+        self.assertEqual(response.data["end"], "2025-01-15T10:00:00Z")
+        self.assertEqual(
+            [response.data[f] for f in ("date", "start_time", "end_time")],
+            ["2025-01-15", "10:00:00", "11:00:00"],
+        )
+
+    def test_multi_day_booking_blocks_overlapping_days(self):
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.post(
+            self.booking_url,
+            {
+                "room": self.room.id,
+                "start": "2025-05-01T18:00:00Z",
+                "end": "2025-05-03T09:00:00Z",
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["end_time"], "09:00:00")
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.post(
+            self.booking_url, {**self.data, "date": "2025-05-02"}
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            self.booking_url, {**self.data, "date": "2025-05-03"}
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_start_must_be_before_end(self):
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.post(
+            self.booking_url,
+            {
+                "room": self.room.id,
+                "start": "2025-05-01T10:00:00Z",
+                "end": "2025-05-01T10:00:00Z",
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_booking_room_same_time_not_allowed(self):
         Booking.objects.create(
             user=self.user1,
             room=self.room,
-            date=date.today(),
-            start_time="10:00",
-            end_time="11:00",
+            **period(date.today(), "10:00", "11:00"),
         )
         self.client.force_authenticate(user=self.user2)
         response = self.client.post(self.booking_url, self.data)
@@ -56,9 +138,7 @@ class BookingAPITests(APITestCase):
         Booking.objects.create(
             user=self.user1,
             room=self.room,
-            date=date.today(),
-            start_time="10:00",
-            end_time="11:00",
+            **period(date.today(), "10:00", "11:00"),
         )
         self.client.force_authenticate(user=self.user1)
         data2 = self.data.copy()
@@ -72,16 +152,12 @@ class BookingAPITests(APITestCase):
         Booking.objects.create(
             user=self.user1,
             room=self.room,
-            date=date.today(),
-            start_time="10:00",
-            end_time="11:00",
+            **period(date.today(), "10:00", "11:00"),
         )
         Booking.objects.create(
             user=self.user2,
             room=self.room,
-            date=date.today(),
-            start_time="11:00",
-            end_time="12:00",
+            **period(date.today(), "11:00", "12:00"),
         )
         self.client.force_authenticate(user=self.user1)
         response = self.client.get(self.booking_url)
@@ -91,21 +167,775 @@ class BookingAPITests(APITestCase):
         Booking.objects.create(
             user=self.user1,
             room=self.room,
-            date=date.today(),
-            start_time="10:00",
-            end_time="11:00",
+            **period(date.today(), "10:00", "11:00"),
         )
         Booking.objects.create(
             user=self.user2,
             room=self.room,
-            date=date.today(),
-            start_time="11:00",
-            end_time="12:00",
+            **period(date.today(), "11:00", "12:00"),
         )
         self.client.force_authenticate(user=self.admin)
         response = self.client.get(self.booking_url)
         self.assertEqual(len(response.data), 2)
 
+    def test_list_matches_model_serializer(self):
+        for hour in range(9, 13):
+            Booking.objects.create(
+                user=self.user1,
+                room=self.room,
+                **period(date.today(), f"{hour}:00", f"{hour}:30"),
+            )
+        bookings = Booking.objects.order_by("id")
+        values_serializer = values_serializer_for(BookingSerializer)
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(values_serializer.to_representation(values_serializer.values(bookings))),
+            renderer.render(BookingSerializer(bookings, many=True).data),
+        )
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(self.booking_url)
+        self.assertEqual(
+            response.content,
+            renderer.render(
+                BookingSerializer(Booking.objects.order_by("id"), many=True).data
+            ),
+        )
+
+
+class BookingTransferTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("user1", "user1@test.com", "pass")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write_csv(self, name, rows):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w", newline="") as f:
+            csv.writer(f).writerows(rows)
+        return path
+
+    def import_bookings(self, *args):
+        call_command("import_bookings", *args, verbosity=0)
+
+    def test_import_rooms_and_bookings(self):
+        rooms = self.write_csv(
+            "rooms.csv",
+            [
+                ["name", "capacity", "floor", "timezone"],
+                ["Room A", 4, 1, ""],
+                ["Room B", 8, 2, "Europe/Berlin"],
+            ],
+        )
+        bookings = self.write_csv(
+            "bookings.csv",
+            [
+                ["room", "user", "date", "start_time", "end_time"],
+                ["Room A", "user1", "2025-05-01", "10:00", "11:00"],
+                ["Room A", "user1", "2025-05-01", "11:00", "12:00"],
+                ["Room B", "user1", "2025-05-02", "10:00", "11:00"],
+            ],
+        )
+        self.import_bookings(bookings, "--rooms", rooms, "--chunk-size", "2")
+        self.assertEqual(Room.objects.count(), 2)
+        # Wall-clock columns are read in the room's time zone.
+        self.assertEqual(
+            list(Booking.objects.order_by("start").values_list("room__name", "start")),
+            [
+                ("Room A", datetime(2025, 5, 1, 10, tzinfo=dt_timezone.utc)),
+                ("Room A", datetime(2025, 5, 1, 11, tzinfo=dt_timezone.utc)),
+                ("Room B", datetime(2025, 5, 2, 8, tzinfo=dt_timezone.utc)),
+            ],
+        )
+
+    def test_import_rejects_overlaps_within_file(self):
+        room = Room.objects.create(name="Room A", capacity=4, floor=1)
+        bookings = self.write_csv(
+            "bookings.csv",
+            [
+                ["room_id", "user", "date", "start_time", "end_time"],
+                [room.id, "user1", "2025-05-01", "09:00", "12:00"],
+                [room.id, "user1", "2025-05-01", "10:00", "10:30"],
+                [room.id, "user1", "2025-05-01", "11:30", "13:00"],
+            ],
+        )
+        with self.assertRaisesMessage(CommandError, "line 4: overlaps line 2"):
+            self.import_bookings(bookings)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_import_rejects_overlaps_with_stored_bookings(self):
+        room = Room.objects.create(name="Room A", capacity=4, floor=1)
+        other_room = Room.objects.create(name="Room B", capacity=4, floor=1)
+        bookings = self.write_csv(
+            "bookings.csv",
+            [
+                ["room_id", "user", "date", "start_time", "end_time"],
+                [room.id, "user1", "2025-05-01", "09:00", "10:00"],
+            ],
+        )
+        self.import_bookings(bookings)
+        with self.assertRaisesMessage(
+            CommandError, "line 2: overlaps an existing booking for the same room"
+        ):
+            self.import_bookings(bookings)
+        User.objects.create_user("user2")
+        bookings = self.write_csv(
+            "other.csv",
+            [
+                ["room_id", "user", "date", "start_time", "end_time"],
+                [room.id, "user2", "2025-05-01", "09:30", "10:30"],
+                [other_room.id, "user1", "2025-05-01", "09:30", "10:30"],
+            ],
+        )
+        with self.assertRaisesMessage(
+            CommandError, "line 3: overlaps an existing booking for the same user"
+        ):
+            self.import_bookings(bookings)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_import_rejects_unknown_room_and_user(self):
+        bookings = self.write_csv(
+            "bookings.csv",
+            [
+                ["room", "user", "date", "start_time", "end_time"],
+                ["Missing", "user1", "2025-05-01", "10:00", "11:00"],
+            ],
+        )
+        with self.assertRaisesMessage(CommandError, "unknown room 'Missing'"):
+            self.import_bookings(bookings)
+
+    def test_export_round_trip(self):
+        room = Room.objects.create(name="Room A", capacity=4, floor=1)
+        Booking.objects.create(
+            user=self.user,
+            room=room,
+            **period(date(2025, 5, 1), "10:00", "11:00"),
+        )
+        rooms = os.path.join(self.tmpdir.name, "rooms.csv")
+        bookings = os.path.join(self.tmpdir.name, "bookings.csv")
+        call_command("export_bookings", bookings, "--rooms", rooms, verbosity=0)
+        Room.objects.all().delete()
+        self.import_bookings(bookings, "--rooms", rooms)
+        self.assertEqual(
+            list(Booking.objects.values_list("room__name", "user__username", "start")),
+            [("Room A", "user1", datetime(2025, 5, 1, 10, tzinfo=dt_timezone.utc))],
+        )
+
+
+class RoomUsageTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("user1", "user1@test.com", "pass")
+        self.room_a = Room.objects.create(name="Room A", capacity=4, floor=1)
+        self.room_b = Room.objects.create(name="Room B", capacity=4, floor=2)
+
+    def stored_usage(self):
+        return {
+            (u.room_id, u.date): (u.booked_minutes, u.booking_count, u.hour_histogram)
+            for u in RoomDayUsage.objects.all()
+        }
+
+    def recomputed_usage(self):
+        delta = UsageDelta()
+        for row in Booking.objects.values_list(*USAGE_FIELDS):
+            delta.add(*row)
+        return {
+            (u.room_id, u.date): (u.booked_minutes, u.booking_count, u.hour_histogram)
+            for u in delta.rows()
+        }
+
+    def test_rollups_follow_booking_changes(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            reverse("booking-list"),
+            {
+                "room": self.room_a.id,
+                "date": "2025-05-01",
+                "start_time": "09:30",
+                "end_time": "11:00",
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        usage = RoomDayUsage.objects.get(room=self.room_a, date=date(2025, 5, 1))
+        self.assertEqual(usage.booked_minutes, 90)
+        self.assertEqual(usage.booking_count, 1)
+        self.assertEqual(usage.hour_histogram[9:11], [30, 60])
+
+        booking = Booking.objects.create(
+            user=self.user,
+            room=self.room_a,
+            **period(date(2025, 5, 1), "13:00", "14:15"),
+        )
+        booking.room = self.room_b
+        booking.start += timedelta(days=1)
+        booking.end += timedelta(days=1)
+        booking.save()
+        Booking.objects.create(
+            user=self.user,
+            room=self.room_b,
+            **period(date(2025, 5, 2), "08:00", "09:00"),
+        ).delete()
+        self.assertEqual(self.stored_usage(), self.recomputed_usage())
+
+        self.client.delete(reverse("booking-detail", args=[response.data["id"]]))
+        self.assertFalse(RoomDayUsage.objects.filter(room=self.room_a).exists())
+        self.assertEqual(self.stored_usage(), self.recomputed_usage())
+
+    def test_move_within_day_updates_histogram(self):
+        booking = Booking.objects.create(
+            user=self.user,
+            room=self.room_a,
+            **period(date(2025, 5, 1), "09:00", "10:00"),
+        )
+        booking.start += timedelta(hours=5)
+        booking.end += timedelta(hours=5)
+        booking.save()
+        usage = RoomDayUsage.objects.get(room=self.room_a)
+        self.assertEqual((usage.booked_minutes, usage.booking_count), (60, 1))
+        self.assertEqual(usage.hour_histogram[9], 0)
+        self.assertEqual(usage.hour_histogram[14], 60)
+        self.assertEqual(self.stored_usage(), self.recomputed_usage())
+
+    def test_multi_day_booking_split_at_local_midnight(self):
+        self.room_b.timezone = "America/New_York"
+        self.room_b.save()
+        Booking.objects.create(
+            user=self.user,
+            room=self.room_b,
+            **period(date(2025, 5, 1), "22:00", "02:30", ZoneInfo("America/New_York")),
+        )
+        usage = RoomDayUsage.objects.filter(room=self.room_b).order_by("date")
+        self.assertEqual(
+            [(u.date, u.booked_minutes, u.booking_count) for u in usage],
+            [(date(2025, 5, 1), 120, 1), (date(2025, 5, 2), 150, 1)],
+        )
+        self.assertEqual(usage[1].hour_histogram[:3], [60, 60, 30])
+        self.assertEqual(self.stored_usage(), self.recomputed_usage())
+
+    def test_backfill_matches_recomputation(self):
+        for day in range(1, 4):
+            Booking.objects.create(
+                user=self.user,
+                room=self.room_a,
+                **period(date(2025, 5, day), "10:00", "12:00"),
+            )
+        RoomDayUsage.objects.all().delete()
+        call_command("backfill_usage", verbosity=0)
+        self.assertEqual(len(self.stored_usage()), 3)
+        self.assertEqual(self.stored_usage(), self.recomputed_usage())
+
+    def test_rebuild_in_chunks_within_range(self):
+        for room in (self.room_a, self.room_b):
+            for day in range(1, 4):
+                Booking.objects.create(
+                    user=self.user,
+                    room=room,
+                    **period(date(2025, 5, day), "10:00", "12:00"),
+                )
+        expected = self.stored_usage()
+        RoomDayUsage.objects.all().delete()
+        # Flushed after each room; days before date_from are left alone.
+        created = rebuild_usage(date_from=date(2025, 5, 2), chunk_size=1)
+        self.assertEqual(created, 4)
+        self.assertEqual(
+            self.stored_usage(),
+            {key: value for key, value in expected.items() if key[1].day >= 2},
+        )
+
+
+@override_settings(
+    BOOKING_MAX_HOURS_PER_WEEK=4, BOOKING_MAX_UPCOMING=3, BOOKING_MAX_LEAD_DAYS=30
+)
+class BookingQuotaTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", "admin@test.com", "pass")
+        self.user = User.objects.create_user("user1", "user1@test.com", "pass")
+        self.room = Room.objects.create(name="Room A", capacity=4, floor=1)
+        self.url = reverse("booking-list")
+        today = timezone.now().date()
+        self.monday = today + timedelta(days=7 - today.weekday())
+
+    def slot(self, week, day, hour, hours):
+        start = utc_midnight(self.monday + timedelta(weeks=week, days=day))
+        start += timedelta(hours=hour)
+        return {
+            "room": self.room.id,
+            "start": start.isoformat(),
+            "end": (start + timedelta(hours=hours)).isoformat(),
+        }
+
+    def book(self, *slot, user=None):
+        self.client.force_authenticate(user=user or self.user)
+        return self.client.post(self.url, self.slot(*slot))
+
+    def counters(self):
+        return sorted(
+            UserWeekUsage.objects.values_list(
+                "user_id", "week", "booked_minutes", "booking_count"
+            )
+        )
+
+    def test_hours_per_week(self):
+        self.assertEqual(self.book(0, 0, 9, 3).status_code, 201)
+        response = self.book(0, 1, 9, 2)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("4 hours", str(response.data))
+        self.assertEqual(self.book(0, 1, 9, 1).status_code, 201)
+        self.assertEqual(self.book(1, 0, 9, 3).status_code, 201)
+        self.assertEqual(
+            self.counters(),
+            [
+                (self.user.id, self.monday, 240, 2),
+                (self.user.id, self.monday + timedelta(weeks=1), 180, 1),
+            ],
+        )
+
+    def test_upcoming_bookings(self):
+        for week in range(3):
+            self.assertEqual(self.book(week, 0, 9, 1).status_code, 201)
+        self.assertEqual(self.book(0, 2, 9, 1).status_code, 400)
+        booking = Booking.objects.filter(user=self.user).first()
+        self.client.delete(reverse("booking-detail", args=[booking.id]))
+        self.assertEqual(self.book(0, 2, 9, 1).status_code, 201)
+
+    def test_lead_time(self):
+        response = self.book(4, 3, 9, 1)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("30 days", str(response.data))
+
+    def test_staff_are_exempt(self):
+        self.assertEqual(self.book(0, 0, 9, 6, user=self.admin).status_code, 201)
+
+    def test_update_checks_overlaps_and_quota(self):
+        own = self.book(0, 0, 9, 1).data["id"]
+        self.book(0, 0, 12, 1, user=self.admin)
+        url = reverse("booking-detail", args=[own])
+        self.client.force_authenticate(user=self.user)
+        response = self.client.patch(url, {"end": self.slot(0, 0, 12, 1)["end"]})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(url, {"start_time": "05:00"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(url, {"start_time": "07:00"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.counters(),
+            [
+                (self.admin.id, self.monday, 60, 1),
+                (self.user.id, self.monday, 180, 1),
+            ],
+        )
+
+    def test_reconcile_restores_counters(self):
+        self.book(0, 0, 9, 2)
+        self.book(1, 6, 23, 2)
+        expected = self.counters()
+        self.assertEqual(len(expected), 3)
+        UserWeekUsage.objects.update(booked_minutes=0)
+        UserWeekUsage.objects.first().delete()
+        call_command("reconcile_quotas", verbosity=0)
+        self.assertEqual(self.counters(), expected)
+
+
+class WaitlistTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner", "owner@test.com", "pass")
+        self.user1 = User.objects.create_user("user1", "user1@test.com", "pass")
+        self.user2 = User.objects.create_user("user2", "user2@test.com", "pass")
+        self.room = Room.objects.create(name="Room A", capacity=4, floor=1)
+        self.day = timezone.now().date() + timedelta(days=1)
+        self.booking = Booking.objects.create(
+            user=self.owner, room=self.room, **period(self.day, "9:00", "12:00")
+        )
+        self.url = reverse("waitlist-list")
+
+    def wait(self, user, start_time, end_time):
+        self.client.force_authenticate(user=user)
+        return self.client.post(
+            self.url,
+            {
+                "room": self.room.id,
+                "date": self.day,
+                "start_time": start_time,
+                "end_time": end_time,
+            },
+        )
+
+    def cancel(self):
+        self.client.force_authenticate(user=self.owner)
+        url = reverse("booking-detail", args=[self.booking.id])
+        self.assertEqual(self.client.delete(url).status_code, 204)
+
+    def bookings(self):
+        return sorted(
+            (booking.user.username, booking.start.time(), booking.end.time())
+            for booking in Booking.objects.filter(room=self.room)
+        )
+
+    def waiting(self):
+        return sorted(
+            (entry.user.username, entry.start.time(), entry.end.time())
+            for entry in WaitlistEntry.objects.all()
+        )
+
+    def test_join_only_when_booked(self):
+        response = self.wait(self.user1, "10:00", "11:00")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["start_time"], "10:00:00")
+        self.assertEqual(self.wait(self.user1, "10:00", "11:00").status_code, 400)
+        response = self.wait(self.user1, "13:00", "14:00")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("available", str(response.data))
+
+        self.assertEqual(len(self.client.get(self.url).data), 1)
+        self.client.force_authenticate(user=self.user2)
+        self.assertEqual(self.client.get(self.url).data, [])
+
+    def test_cancellation_books_oldest_entries_that_fit(self):
+        self.wait(self.user1, "10:00", "11:00")
+        self.wait(self.user2, "10:30", "11:30")
+        self.wait(self.user2, "11:00", "12:00")
+        self.wait(self.user1, "8:00", "9:30")
+
+        self.cancel()
+        self.assertEqual(
+            self.bookings(),
+            [
+                ("user1", time(8), time(9, 30)),
+                ("user1", time(10), time(11)),
+                ("user2", time(11), time(12)),
+            ],
+        )
+        self.assertEqual(self.waiting(), [("user2", time(10, 30), time(11, 30))])
+        events = Job.objects.filter(name="bookings.notify").values_list(
+            "payload__event", flat=True
+        )
+        self.assertEqual(list(events).count("created from the waitlist"), 3)
+
+    def test_shrinking_frees_the_rest(self):
+        self.wait(self.user1, "10:00", "11:00")
+        self.wait(self.user2, "9:30", "10:30")
+        self.client.force_authenticate(user=self.owner)
+        url = reverse("booking-detail", args=[self.booking.id])
+        response = self.client.patch(url, {"end_time": "10:00"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.bookings(),
+            [("owner", time(9), time(10)), ("user1", time(10), time(11))],
+        )
+        self.assertEqual(self.waiting(), [("user2", time(9, 30), time(10, 30))])
+
+    def test_entries_of_busy_users_keep_waiting(self):
+        other = Room.objects.create(name="Room B", capacity=4, floor=1)
+        Booking.objects.create(
+            user=self.user1, room=other, **period(self.day, "10:00", "11:00")
+        )
+        self.wait(self.user1, "10:00", "11:00")
+        self.wait(self.user2, "10:00", "11:00")
+        self.cancel()
+        self.assertEqual(self.bookings(), [("user2", time(10), time(11))])
+        self.assertEqual(self.waiting(), [("user1", time(10), time(11))])
+
+    def test_cancellation_cost_ignores_other_entries(self):
+        def cancellation_queries():
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    self.cancel()
+                transaction.set_rollback(True)
+            return len(queries)
+
+        self.wait(self.user1, "10:00", "11:00")
+        expected = cancellation_queries()
+        WaitlistEntry.objects.bulk_create(
+            WaitlistEntry(
+                user=self.user2,
+                room=self.room,
+                **period(self.day + timedelta(days=i), "9:00", "12:00"),
+            )
+            for i in range(1, 200)
+        )
+        self.assertEqual(cancellation_queries(), expected)
+
+
+class BookingIdempotencyTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("user1", "user1@test.com", "pass")
+        self.room = Room.objects.create(name="Room A", capacity=4, floor=1)
+        self.url = reverse("booking-list")
+        self.data = {
+            "room": self.room.id,
+            "date": date.today(),
+            "start_time": "10:00",
+            "end_time": "11:00",
+        }
+        # With the office claims of a login token, as in production.
+        token = OfficeTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.force_authenticate(user=self.user, token=token)
+
+    def post(self, key, data=None):
+        return self.client.post(self.url, data or self.data, HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_first_response(self):
+        first = self.post("key-1")
+        self.assertEqual(first.status_code, 201)
+        # Replays read the stored response only: no booking queries or locks.
+        with self.assertNumQueries(1):
+            retry = self.post("key-1")
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(self.post("key-2").status_code, 400)
+
+    def test_key_reused_for_different_request(self):
+        self.post("key-1")
+        response = self.post("key-1", {**self.data, "start_time": "09:00"})
+        self.assertEqual(response.status_code, 422)
+
+    def test_failed_request_releases_key(self):
+        Booking.objects.create(
+            user=self.user, room=self.room, **period(date.today(), "10:30", "12:00")
+        )
+        self.assertEqual(self.post("key-1").status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        Booking.objects.all().delete()
+        self.assertEqual(self.post("key-1").status_code, 201)
+
+    def test_in_progress_and_expired_keys(self):
+        record = IdempotencyKey.objects.create(
+            user=self.user,
+            key="key-1",
+            fingerprint="",
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        self.assertEqual(self.post("key-1").status_code, 409)
+        record.expires_at = timezone.now()
+        record.save()
+        self.assertEqual(self.post("key-1").status_code, 201)
+        call_command("prune_idempotency_keys", verbosity=0)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_delete_retry(self):
+        booking = Booking.objects.create(
+            user=self.user, room=self.room, **period(date.today(), "10:00", "11:00")
+        )
+        url = reverse("booking-detail", args=[booking.id])
+        for _ in range(2):
+            response = self.client.delete(url, HTTP_IDEMPOTENCY_KEY="delete-1")
+            self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            BookingChange.objects.filter(action=BookingChange.Action.DELETED).count(),
+            1,
+        )
+
+
+class BookingSyncTests(APITestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user("user1", "user1@test.com", "pass")
+        self.user2 = User.objects.create_user("user2", "user2@test.com", "pass")
+        self.room = Room.objects.create(name="Room A", capacity=4, floor=1)
+        self.other_room = Room.objects.create(name="Room B", capacity=4, floor=1)
+        self.changes_url = reverse("booking-changes")
+
+    def book(self, user, start_time, room=None):
+        return Booking.objects.create(
+            user=user,
+            room=room or self.room,
+            **period(
+                date.today(), start_time, start_time.replace(hour=start_time.hour + 1)
+            ),
+        )
+
+    def test_full_sync_then_deltas(self):
+        kept = self.book(self.user1, time(9))
+        moved = self.book(self.user1, time(11))
+        removed = self.book(self.user1, time(13))
+        self.book(self.user2, time(15))
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(self.changes_url)
+        self.assertEqual(
+            [b["id"] for b in response.data["upserted"]],
+            [kept.id, moved.id, removed.id],
+        )
+        token = response.data["sync_token"]
+
+        response = self.client.get(self.changes_url, {"sync_token": token})
+        self.assertEqual(response.data["upserted"], [])
+        self.assertEqual(response.data["deleted"], [])
+
+        added = self.book(self.user1, time(16))
+        moved.start = moved.start.replace(hour=10)
+        moved.save()
+        removed_id = removed.id
+        removed.delete()
+        self.book(self.user2, time(17))
+        response = self.client.get(self.changes_url, {"sync_token": token})
+        self.assertEqual(
+            [(b["id"], b["start_time"]) for b in response.data["upserted"]],
+            [(moved.id, "10:00:00"), (added.id, "16:00:00")],
+        )
+        self.assertEqual(response.data["deleted"], [removed_id])
+        self.assertFalse(response.data["has_more"])
+
+        token = response.data["sync_token"]
+        response = self.client.get(self.changes_url, {"sync_token": token})
+        self.assertEqual(response.data["upserted"], [])
+        self.assertEqual(response.data["sync_token"], token)
+
+    def test_room_feed_sees_bookings_moved_away(self):
+        booking = self.book(self.user1, time(9))
+        self.client.force_authenticate(user=self.user1)
+        params = {"room": self.room.id}
+        token = self.client.get(self.changes_url, params).data["sync_token"]
+        booking.room = self.other_room
+        booking.save()
+        response = self.client.get(self.changes_url, {**params, "sync_token": token})
+        self.assertEqual(response.data["upserted"], [])
+        self.assertEqual(response.data["deleted"], [booking.id])
+
+    def test_expired_and_invalid_tokens(self):
+        self.book(self.user1, time(9))
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(self.changes_url, {"sync_token": "abc"})
+        self.assertEqual(response.status_code, 400)
+        token = self.client.get(self.changes_url).data["sync_token"]
+        BookingChange.objects.all().delete()
+        response = self.client.get(self.changes_url, {"sync_token": token})
+        self.assertEqual(response.status_code, 410)
+
+    def test_token_zero_gets_full_sync_after_pruning(self):
+        self.client.force_authenticate(user=self.user1)
+        token = self.client.get(self.changes_url).data["sync_token"]
+        self.assertEqual(token, "0")
+        first = self.book(self.user1, time(9))
+        second = self.book(self.user1, time(11))
+        BookingChange.objects.filter(booking_id=first.id).delete()
+        response = self.client.get(self.changes_url, {"sync_token": token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [b["id"] for b in response.data["upserted"]], [first.id, second.id]
+        )
+
+    def test_imported_bookings_are_in_the_change_log(self):
+        self.client.force_authenticate(user=self.user1)
+        token = self.client.get(self.changes_url).data["sync_token"]
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            csv.writer(f).writerows(
+                [
+                    ["room", "user", "date", "start_time", "end_time"],
+                    ["Room A", "user1", "2025-05-01", "10:00", "11:00"],
+                ]
+            )
+        self.addCleanup(os.remove, f.name)
+        call_command("import_bookings", f.name, verbosity=0)
+        response = self.client.get(self.changes_url, {"sync_token": token})
+        self.assertEqual([b["date"] for b in response.data["upserted"]], ["2025-05-01"])
+
+    def test_user_calendar_feed(self):
+        booking = self.book(self.user1, time(9))
+        self.book(self.user2, time(11))
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(
+            reverse("booking-calendar"), HTTP_ACCEPT="text/calendar"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        content = b"".join(response.streaming_content).decode()
+        self.assertTrue(content.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertEqual(content.count("BEGIN:VEVENT"), 1)
+        self.assertIn(f"UID:booking-{booking.id}@meetingroom-api", content)
+        day = date.today().strftime("%Y%m%d")
+        self.assertIn(f"DTSTART:{day}T090000Z\r\n", content)
+        self.assertIn(f"DTEND:{day}T100000Z\r\n", content)
+        self.assertIn("SUMMARY:Room A booked by user1\r\n", content)
+
+    def test_calendar_feeds_at_exact_ics_urls(self):
+        self.book(self.user1, time(9))
+        self.client.force_authenticate(user=self.user1)
+        urls = [
+            "/api/bookings/calendar.ics",
+            f"/api/rooms/{self.room.id}/calendar.ics",
+        ]
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+            content = b"".join(response.streaming_content).decode()
+            self.assertEqual(content.count("BEGIN:VEVENT"), 1)
+
+    def test_room_calendar_feed_hides_other_users(self):
+        self.book(self.user1, time(9))
+        self.book(self.user2, time(11))
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get(reverse("room-calendar", args=[self.room.id]))
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(content.count("BEGIN:VEVENT"), 2)
+        self.assertIn("SUMMARY:Booked by user1\r\n", content)
+        self.assertIn("SUMMARY:Busy\r\n", content)
+        response = self.client.get(
+            reverse("room-calendar", args=[self.room.id]), {"date_from": "tomorrow"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class BookingAdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", "admin@test.com", "pass")
+        self.client.force_login(self.admin)
+        self.url = reverse("admin:bookings_booking_changelist")
+        self.day = date(2025, 5, 5)
+
+    def add_bookings(self, count):
+        start = Booking.objects.count()
+        for i in range(start, start + count):
+            user = User.objects.create(username=f"user{i}")
+            room = Room.objects.create(name=f"Room {i}", capacity=4, floor=1)
+            Booking.objects.create(
+                user=user, room=room, **period(self.day, time(9), time(10))
+            )
+
+    def changelist_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_has_no_distinct_date_scan(self):
+        self.add_bookings(2)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        for query in queries:
+            self.assertNotIn("DISTINCT", query["sql"])
+            self.assertNotIn("DATE_TRUNC", query["sql"])
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.add_bookings(2)
+        # Filtered by a start range and a room.
+        params = {
+            "start__gte": "2025-05-01",
+            "start__lt": "2025-06-01",
+            "room__id__exact": Room.objects.first().pk,
+        }
+        queries = self.changelist_queries()
+        filtered = self.changelist_queries(**params)
+        self.add_bookings(20)
+        self.assertEqual(self.changelist_queries(), queries)
+        self.assertEqual(self.changelist_queries(**params), filtered)
+
+    def test_estimated_count_skips_count(self):
+        self.add_bookings(30)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE bookings_booking")
+
+        class Paginator(EstimatedCountPaginator):
+            estimate_threshold = 1
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(Paginator(Booking.objects.order_by("id"), 10).count, 30)
+        self.assertNotIn("COUNT(", queries[0]["sql"])
+        paginator = Paginator(
+            Booking.objects.filter(user__username="user1").order_by("id"), 10
+        )
+        self.assertEqual(paginator.count, 1)
+
 
 class BookingAPILiveTests(LiveServerTestCase):
     def setUp(self):
@@ -149,3 +979,64 @@ class BookingAPILiveTests(LiveServerTestCase):
         has_failed_booking = any(r.status_code == 400 for r in results)
         self.assertTrue(has_succeded_booking)
         self.assertTrue(has_failed_booking)
+
+    def test_concurrent_retries_with_same_idempotency_key(self):
+        data = {
+            "room": self.room.id,
+            "date": date.today().isoformat(),
+            "start_time": "16:00",
+            "end_time": "17:00",
+        }
+        url = f"{self.live_server_url}{reverse('booking-list')}"
+        headers = {
+            "Authorization": f"Bearer {self.get_jwt_token(self.user1)}",
+            "Idempotency-Key": "retry-1",
+        }
+        with ThreadPoolExecutor() as executor:
+            futures = [
+                executor.submit(requests.post, url, json=data, headers=headers)
+                for _ in range(4)
+            ]
+            results = [f.result() for f in futures]
+        statuses = {r.status_code for r in results}
+        self.assertIn(201, statuses)
+        self.assertLessEqual(statuses, {201, 409})
+        self.assertEqual(Booking.objects.count(), 1)
+        created = [r.json()["id"] for r in results if r.status_code == 201]
+        self.assertEqual(set(created), {Booking.objects.get().id})
+
+    def test_sync_token_waits_for_changes_committing_out_of_order(self):
+        # Separate rooms and users, so that the writers share no locks.
+        other_room = Room.objects.create(name="other room", capacity=1, floor=1)
+
+        def book(user, room, hour):
+            return Booking.objects.create(
+                user=user, room=room, **period(date.today(), time(hour), time(hour + 1))
+            )
+
+        synced = book(self.user1, self.room, 9)
+        written = threading.Event()
+        commit = threading.Event()
+
+        def book_and_wait():
+            try:
+                with transaction.atomic():
+                    booking = book(self.user2, other_room, 11)
+                    written.set()
+                    commit.wait(10)
+                return booking.pk
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor() as executor:
+            slow = executor.submit(book_and_wait)
+            self.assertTrue(written.wait(10))
+            # A later change id, committed before the slow one.
+            fast = book(self.user1, self.room, 13)
+            token = current_token()
+            commit.set()
+            slow_id = slow.result()
+
+        self.assertEqual(token, BookingChange.objects.get(booking_id=synced.pk).pk)
+        _, upserted, _, _ = changes_since(BookingChange.objects.all(), token, 10)
+        self.assertEqual(sorted(upserted), sorted([slow_id, fast.pk]))
@@ -0,0 +1,367 @@
+"""
+Bulk import and export of rooms and bookings.
+
+Rows are validated in chunks against in-memory ``Room``/``User`` maps, checked
+for overlaps with each other and with stored bookings by a sort-based sweep,
+and loaded with PostgreSQL ``COPY``.
+Other database backends fall back to ``bulk_create``/``iterator()``.
+
+Rooms are imported into, and exported from, the default office.
+"""
+
+import csv
+import io
+from datetime import date, datetime, time
+from itertools import islice
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Max, Q
+from django.utils import timezone
+from rooms.models import Room, validate_timezone
+
+from .models import Booking, BookingChange, NextTxid, local_period
+
+FORMATS = ["csv", "parquet"]
+ROOM_COLUMNS = ["name", "capacity", "floor", "timezone"]
+BOOKING_COLUMNS = ["room", "user", "start", "end"]
+MAX_REPORTED_ERRORS = 20
+
+# Positions in the validated booking tuples.
+ROOM, START, END, USER, LINE = range(5)
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return "parquet" if str(path).endswith(".parquet") else "csv"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise CommandError("Parquet support requires the 'pyarrow' package.")
+    return pyarrow
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def read_rows(path, fmt):
+    """Yield ``(line, row)`` pairs, where ``row`` maps column names to values."""
+    if fmt == "parquet":
+        pyarrow = _import_pyarrow()
+        line = 1
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches():
+            for row in batch.to_pylist():
+                line += 1
+                yield line, row
+        return
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+
+
+class RowErrors:
+    """Collects validation errors and aborts once too many have been seen."""
+
+    def __init__(self):
+        self.messages = []
+
+    def add(self, line, message):
+        self.messages.append(f"line {line}: {message}")
+        if len(self.messages) >= MAX_REPORTED_ERRORS:
+            self.raise_if_any()
+
+    def raise_if_any(self):
+        if self.messages:
+            raise CommandError("Invalid rows:\n" + "\n".join(self.messages))
+
+
+def _parse_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _parse_time(value):
+    return value if isinstance(value, time) else time.fromisoformat(value)
+
+
+def _parse_datetime(value, tz):
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(value)
+    return value if timezone.is_aware(value) else value.replace(tzinfo=tz)
+
+
+def _parse_period(row, tz):
+    """
+    Read ``start``/``end`` datetimes, or ``date``/``start_time``/``end_time``
+    in the room's time zone. Naive datetimes are in the room's time zone too.
+    """
+    if row.get("start") not in (None, ""):
+        return _parse_datetime(row["start"], tz), _parse_datetime(row["end"], tz)
+    return local_period(
+        _parse_date(row["date"]),
+        _parse_time(row["start_time"]),
+        _parse_time(row["end_time"]),
+        tz,
+    )
+
+
+def _resolve(row, column, ids, by_name):
+    """Resolve a ``<column>_id`` or ``<column>`` (natural key) cell to a pk."""
+    raw_id = row.get(f"{column}_id")
+    if raw_id not in (None, ""):
+        pk = int(raw_id)
+        if pk not in ids:
+            raise ValueError(f"unknown {column} id {pk}")
+        return pk
+    name = row.get(column)
+    if name not in by_name:
+        raise ValueError(f"unknown {column} {name!r}")
+    return by_name[name]
+
+
+def validate_rooms(rows, errors):
+    """
+    Return ``(name, capacity, floor, timezone)`` tuples for rooms not yet in
+    the DB. ``timezone`` defaults to UTC.
+    """
+    seen = set(Room.objects.filter(office=None).values_list("name", flat=True))
+    rooms = []
+    for line, row in rows:
+        try:
+            name = row["name"]
+            capacity = int(row["capacity"])
+            floor = int(row["floor"])
+            tz = row.get("timezone") or "UTC"
+            validate_timezone(tz)
+        except ValidationError as exc:
+            errors.add(line, exc.messages[0])
+            continue
+        except (KeyError, TypeError, ValueError) as exc:
+            errors.add(line, f"invalid room ({exc})")
+            continue
+        if not name or capacity < 0:
+            errors.add(line, "room name is required and capacity must be positive")
+        elif name in seen:
+            errors.add(line, f"room {name!r} already exists")
+        else:
+            seen.add(name)
+            rooms.append((name, capacity, floor, tz))
+    return rooms
+
+
+def validate_bookings(rows, errors, chunk_size, progress):
+    """
+    Return ``(room_id, start, end, user_id, line)`` tuples.
+
+    Rows are parsed a chunk at a time; rooms and users are resolved by id or
+    by name/username against maps loaded once up front.
+    """
+    rooms = Room.objects.filter(office=None)
+    room_by_name = dict(rooms.values_list("name", "id"))
+    room_tz = {pk: ZoneInfo(tz) for pk, tz in rooms.values_list("id", "timezone")}
+    room_ids = set(room_by_name.values())
+    user_by_name = dict(User.objects.values_list("username", "id"))
+    user_ids = set(user_by_name.values())
+    bookings = []
+    for chunk in chunked(rows, chunk_size):
+        for line, row in chunk:
+            try:
+                room_id = _resolve(row, "room", room_ids, room_by_name)
+                user_id = _resolve(row, "user", user_ids, user_by_name)
+                start, end = _parse_period(row, room_tz[room_id])
+            except (KeyError, TypeError, ValueError) as exc:
+                errors.add(line, f"invalid booking ({exc})")
+                continue
+            if start >= end:
+                errors.add(line, "start must be before end")
+                continue
+            bookings.append((room_id, start, end, user_id, line))
+        progress(f"Validated {len(bookings)} bookings")
+    return bookings
+
+
+def existing_bookings(bookings):
+    """
+    Return the stored bookings of the rooms and users of ``bookings`` that
+    fall in their overall time range, as tuples like ``bookings`` whose line
+    is ``None``.
+    """
+    if not bookings:
+        return []
+    stored = (
+        Booking.objects.filter(
+            Q(room_id__in={b[ROOM] for b in bookings})
+            | Q(user_id__in={b[USER] for b in bookings}),
+            start__lt=max(b[END] for b in bookings),
+            end__gt=min(b[START] for b in bookings),
+        )
+        .order_by()
+        .values_list("room_id", "start", "end", "user_id")
+    )
+    return [booking + (None,) for booking in stored.iterator()]
+
+
+def find_overlaps(bookings, owner):
+    """
+    Return ``(line, line)`` pairs of bookings overlapping for the same owner
+    (``ROOM`` or ``USER``).
+
+    Bookings are sorted by owner and start; each one is compared with the
+    furthest-reaching earlier booking of the same owner.
+    """
+    overlaps = []
+    latest = None
+    for booking in sorted(bookings, key=lambda b: (b[owner], b[START])):
+        if latest is not None and booking[owner] == latest[owner]:
+            if booking[START] < latest[END]:
+                overlaps.append((latest[LINE], booking[LINE]))
+            if booking[END] <= latest[END]:
+                continue
+        latest = booking
+    return overlaps
+
+
+def copy_rows(model, fields, rows, chunk_size, progress):
+    """Load ``rows`` (tuples ordered like ``fields``) into ``model``'s table."""
+    loaded = 0
+    if connection.vendor != "postgresql":
+        for chunk in chunked(rows, chunk_size):
+            model.objects.bulk_create(model(**dict(zip(fields, row))) for row in chunk)
+            loaded += len(chunk)
+            progress(f"Loaded {loaded} {model._meta.verbose_name_plural}")
+        return loaded
+
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(quote_name(model._meta.get_field(f).column) for f in fields)
+    sql = f"COPY {quote_name(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+    with connection.cursor() as cursor:
+        for chunk in chunked(rows, chunk_size):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(chunk)
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            loaded += len(chunk)
+            progress(f"Loaded {loaded} {model._meta.verbose_name_plural}")
+    return loaded
+
+
+def load_rooms(rooms, chunk_size, progress):
+    rows = (room + (False,) for room in rooms)
+    fields = ROOM_COLUMNS + ["deleting"]
+    return copy_rows(Room, fields, rows, chunk_size, progress)
+
+
+def load_bookings(bookings, chunk_size, progress):
+    """
+    Load validated bookings and add them to the change log, so that clients
+    syncing with a token see them as created.
+    """
+    now = timezone.now()
+    rows = (booking[:LINE] + (now,) for booking in bookings)
+    fields = ["room_id", "start", "end", "user_id", "updated_at"]
+    last_id = Booking.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+    loaded = copy_rows(Booking, fields, rows, chunk_size, progress)
+    _record_created(last_id, now)
+    return loaded
+
+
+def _record_created(after_id, now):
+    """Insert ``created`` changes for bookings with ids above ``after_id``."""
+    quote_name = connection.ops.quote_name
+    booking = Booking._meta
+    change = BookingChange._meta
+    change_columns = ", ".join(
+        quote_name(change.get_field(f).column)
+        for f in (
+            "booking_id",
+            "room_id",
+            "user_id",
+            "action",
+            "created_at",
+            "visible_after",
+        )
+    )
+    booking_columns = ", ".join(
+        quote_name(booking.get_field(f).column) for f in ("id", "room", "user")
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote_name(change.db_table)} ({change_columns}) "
+            f"SELECT {booking_columns}, %s, %s, {NextTxid.template} "
+            f"FROM {quote_name(booking.db_table)} "
+            f"WHERE {quote_name(booking.pk.column)} > %s",
+            [BookingChange.Action.CREATED, now, after_id],
+        )
+
+
+def room_export_queryset():
+    return Room.objects.filter(office=None).order_by("id").values_list(*ROOM_COLUMNS)
+
+
+def booking_export_queryset():
+    return Booking.objects.filter(office=None).order_by("id").values_list(
+        "room__name", "user__username", "start", "end"
+    )
+
+
+def export_rows(queryset, columns, path, fmt, chunk_size, progress):
+    """
+    Stream ``queryset`` (a ``values_list()`` queryset) to ``path``.
+
+    CSV on PostgreSQL is written by ``COPY ... TO STDOUT``; everything else
+    iterates the queryset with a server-side cursor, so memory use stays
+    bounded by ``chunk_size`` either way.
+    """
+    if fmt == "parquet":
+        return _export_parquet(queryset, columns, path, chunk_size, progress)
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        if connection.vendor == "postgresql":
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                query = cursor.mogrify(sql, params).decode()
+                f.flush()
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv)", f)
+                return cursor.rowcount
+        exported = 0
+        for chunk in chunked(queryset.iterator(chunk_size=chunk_size), chunk_size):
+            writer.writerows(chunk)
+            exported += len(chunk)
+            progress(f"Exported {exported} rows")
+        return exported
+
+
+def _export_parquet(queryset, columns, path, chunk_size, progress):
+    pyarrow = _import_pyarrow()
+    exported = 0
+    writer = None
+    try:
+        for chunk in chunked(queryset.iterator(chunk_size=chunk_size), chunk_size):
+            table = pyarrow.Table.from_arrays(
+                [pyarrow.array(column) for column in zip(*chunk)], names=columns
+            )
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            exported += len(chunk)
+            progress(f"Exported {exported} rows")
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        empty = pyarrow.table({column: pyarrow.array([], pyarrow.string()) for column in columns})
+        pyarrow.parquet.write_table(empty, path)
+    return exported
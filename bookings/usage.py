@@ -0,0 +1,187 @@
+"""
+Occupancy rollups: per-room, per-day booked minutes, booking counts and
+hour histograms (``RoomDayUsage``).
+
+Rollups are maintained incrementally from ``Booking`` signals (see
+``signals.py``) and can be rebuilt from scratch with ``rebuild_usage``.
+Queryset ``update()``/``delete()`` bypass signals and need a rebuild.
+
+Days are those of the room's time zone; bookings spanning several days are
+split at local midnight.
+"""
+
+import calendar
+from datetime import timedelta
+from operator import itemgetter
+from zoneinfo import ZoneInfo
+
+from django.db.models import Count, F, IntegerField, Sum
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast, TruncMonth, TruncWeek
+
+from .counters import CounterDelta, rebuild_counters
+from .models import Booking, RoomDayUsage, empty_hour_histogram, utc_midnight
+
+USAGE_FIELDS = ("room_id", "start", "end", "room__timezone")
+# Bounds the distance between a UTC day and the same day in any time zone.
+MAX_UTC_OFFSET = timedelta(hours=14)
+PERIODS = {
+    "day": F("date"),
+    "week": TruncWeek("date"),
+    "month": TruncMonth("date"),
+}
+GROUPS = {
+    "room": "room_id",
+    "floor": "room__floor",
+}
+
+
+def _minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+
+def _hour_histogram(start, end):
+    histogram = empty_hour_histogram()
+    for hour in range(start // 60, (end - 1) // 60 + 1):
+        histogram[hour] = min(end, (hour + 1) * 60) - max(start, hour * 60)
+    return histogram
+
+
+def booking_usage(start, end, timezone):
+    """
+    Return ``{date: (minutes, hour_histogram)}`` for a single booking, with
+    one entry per day of ``timezone`` it covers.
+    """
+    tz = ZoneInfo(timezone)
+    start = start.astimezone(tz)
+    end = end.astimezone(tz)
+    usage = {}
+    day = start.date()
+    while day <= end.date():
+        first = _minute_of_day(start) if day == start.date() else 0
+        last = _minute_of_day(end) if day == end.date() else 24 * 60
+        if last > first:
+            usage[day] = (last - first, _hour_histogram(first, last))
+        day += timedelta(days=1)
+    return usage
+
+
+class UsageDelta(CounterDelta):
+    """
+    Accumulates signed booking contributions keyed by ``(room_id, date)``.
+    Days outside ``date_from``/``date_to`` are left out.
+    """
+
+    model = RoomDayUsage
+    key_fields = ("room_id", "date")
+    fields = ("booked_minutes", "booking_count", "hour_histogram")
+
+    def __init__(self, date_from=None, date_to=None):
+        super().__init__()
+        self.date_from = date_from
+        self.date_to = date_to
+
+    def empty_total(self):
+        return [0, 0, empty_hour_histogram()]
+
+    def add(self, room_id, start, end, timezone, sign=1):
+        for day, (minutes, histogram) in booking_usage(start, end, timezone).items():
+            if (self.date_from is None or day >= self.date_from) and (
+                self.date_to is None or day <= self.date_to
+            ):
+                self.add_total((room_id, day), minutes, 1, histogram, sign=sign)
+
+    def keep(self, usage):
+        return usage.booking_count > 0
+
+
+def rebuild_usage(room_ids=None, date_from=None, date_to=None, chunk_size=10000):
+    """Recompute rollups from ``Booking`` for the given rooms and date range."""
+    bookings = Booking.objects.all()
+    usage = RoomDayUsage.objects.all()
+    if room_ids is not None:
+        bookings = bookings.filter(room_id__in=room_ids)
+        usage = usage.filter(room_id__in=room_ids)
+    # Bookings overlapping the range in some time zone; the rollups are
+    # clipped to the range by the deltas.
+    if date_from:
+        bookings = bookings.filter(end__gt=utc_midnight(date_from) - MAX_UTC_OFFSET)
+        usage = usage.filter(date__gte=date_from)
+    if date_to:
+        bookings = bookings.filter(
+            start__lt=utc_midnight(date_to + timedelta(days=1)) + MAX_UTC_OFFSET
+        )
+        usage = usage.filter(date__lte=date_to)
+
+    rows = bookings.order_by("room_id", "start").values_list(*USAGE_FIELDS)
+    return rebuild_counters(
+        usage,
+        rows,
+        lambda: UsageDelta(date_from, date_to),
+        itemgetter(0),
+        chunk_size,
+    )
+
+
+def _period_days(period, start, date_from, date_to):
+    if period == "day":
+        end = start
+    elif period == "week":
+        end = start + timedelta(days=6)
+    else:
+        end = start.replace(day=calendar.monthrange(start.year, start.month)[1])
+    start = max(start, date_from)
+    end = min(end, date_to)
+    return (end - start).days + 1
+
+
+def occupancy(rooms, group_by, period, date_from, date_to):
+    """
+    Aggregate the rollups of ``rooms`` from ``date_from`` to ``date_to`` into
+    one entry per group and period, summed in the database.
+
+    ``utilization`` is the booked share of the group's rooms over the whole
+    days of the period that fall within ``date_from``/``date_to``.
+    """
+    group_field = GROUPS[group_by]
+    rows = (
+        RoomDayUsage.objects.filter(
+            room__in=rooms, date__gte=date_from, date__lte=date_to
+        )
+        .annotate(period_start=PERIODS[period])
+        .values_list(group_field, "period_start")
+        .annotate(
+            total_minutes=Sum("booked_minutes"),
+            total_count=Sum("booking_count"),
+            **{
+                f"hour_{hour}": Sum(Cast(KT(f"hour_histogram__{hour}"), IntegerField()))
+                for hour in range(24)
+            },
+        )
+        .order_by("period_start", group_field)
+    )
+
+    room_group_field = "id" if group_by == "room" else group_field.split("__", 1)[1]
+    room_counts = dict(
+        rooms.order_by().values_list(room_group_field).annotate(Count("id"))
+    )
+
+    results = []
+    for group, period_start, minutes, count, *histogram in rows:
+        days = _period_days(period, period_start, date_from, date_to)
+        capacity_minutes = room_counts.get(group, 0) * days * 24 * 60
+        peak = max(histogram)
+        results.append(
+            {
+                group_by: group,
+                "period_start": period_start.isoformat(),
+                "booked_minutes": minutes,
+                "booking_count": count,
+                "utilization": (
+                    round(minutes / capacity_minutes, 4) if capacity_minutes else None
+                ),
+                "peak_hour": histogram.index(peak) if peak else None,
+                "hour_histogram": histogram,
+            }
+        )
+    return results
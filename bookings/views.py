@@ -1,10 +1,63 @@
+from datetime import datetime, timedelta
+
 from django.db import transaction
-from rest_framework import permissions, viewsets
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from jobs.queue import enqueue
+from meetingroom_api.fastpath import ValuesListMixin
+from offices.tenancy import OfficeScopedMixin
+from rest_framework import mixins, permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
 from rooms.models import Room
 
-from .models import Booking
-from .serializers import BookingSerializer
+from .calendar import CALENDAR_FIELDS, ICalendarRenderer, render_calendar
+from .idempotency import IdempotencyMixin
+from .models import Booking, BookingChange, WaitlistEntry, utc_midnight
+from .quotas import QuotaExceeded, check_quota
+from .serializers import BookingSerializer, WaitlistEntrySerializer
+from .sync import SyncTokenExpired, changes_since, current_token
+from .tasks import notification_payload
+
+CALENDAR_DEFAULT_PAST_DAYS = 30
+SYNC_PAGE_SIZE = 1000
+
+
+def calendar_response(bookings, request, name, summary):
+    """
+    Stream ``bookings`` as an iCalendar feed, limited to ``date_from``/``date_to``
+    (by default the last 30 days onwards).
+    """
+    dates = {}
+    for param in ("date_from", "date_to"):
+        value = request.query_params.get(param)
+        if value:
+            try:
+                dates[param] = datetime.strptime(value, "%Y-%m-%d").date()
+            except ValueError:
+                return Response(
+                    {"detail": f"Invalid {param} format. Use YYYY-MM-DD."}, status=400
+                )
+    date_from = dates.get("date_from") or (
+        timezone.now().date() - timedelta(days=CALENDAR_DEFAULT_PAST_DAYS)
+    )
+    # Dates are UTC days; a booking is included if it overlaps them.
+    bookings = bookings.filter(end__gt=utc_midnight(date_from))
+    if "date_to" in dates:
+        bookings = bookings.filter(
+            start__lt=utc_midnight(dates["date_to"] + timedelta(days=1))
+        )
+    rows = (
+        bookings.order_by("start")
+        .values_list(*CALENDAR_FIELDS)
+        .iterator(chunk_size=2000)
+    )
+    return StreamingHttpResponse(
+        render_calendar(rows, name, summary),
+        content_type="text/calendar; charset=utf-8",
+    )
 
 
 class IsOwnerOrAdmin(permissions.BasePermission):
@@ -12,34 +65,189 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         return request.user.is_staff or obj.user == request.user
 
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(
+    OfficeScopedMixin, IdempotencyMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
 
     def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Booking.objects.none()
+        bookings = Booking.objects.filter(office_id=self.office_id)
+        if self.request.user.is_staff:
+            return bookings
+        return bookings.filter(user=self.request.user)
+
+    def check_booking(self, user, room, start, end, booking=None):
+        """
+        Reject overlaps and quota violations of ``user`` booking ``room``
+        for ``[start, end)``, replacing ``booking`` when updating. Must run in
+        the transaction that saves the booking.
+        """
+        # Lock the Room row to serialize booking writes for this room
+        if Room.objects.select_for_update().get(pk=room.pk).deleting:
+            raise ValidationError("Room is being deleted.")
+        others = Booking.objects.all()
+        if booking is not None:
+            others = others.exclude(pk=booking.pk)
+        # Check for overlapping booking in the same room
+        if others.filter(room=room).overlapping(start, end).exists():
+            raise ValidationError("Room already booked for this time slot.")
+        # Check if user already has booking for this time
+        if others.filter(user=user).overlapping(start, end).exists():
+            raise ValidationError("You already have a booking at this time.")
+        if self.request.user.is_staff:
+            return
+        previous = None if booking is None else (booking.start, booking.end)
+        try:
+            check_quota(user, start, end, previous)
+        except QuotaExceeded as exc:
+            raise ValidationError(str(exc))
+
+    def perform_create(self, serializer):
+        user = self.request.user
+        data = serializer.validated_data
+        with transaction.atomic():
+            self.check_booking(user, data["room"], data["start"], data["end"])
+            booking = serializer.save(user=user)
+            enqueue(
+                "bookings.notify", notification_payload(booking, "created"), user=user
+            )
+
+    def perform_update(self, serializer):
+        booking = serializer.instance
+        data = serializer.validated_data
+        with transaction.atomic():
+            self.check_booking(
+                booking.user,
+                data.get("room", booking.room),
+                data.get("start", booking.start),
+                data.get("end", booking.end),
+                booking,
+            )
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            enqueue(
+                "bookings.notify",
+                notification_payload(instance, "cancelled"),
+                user=self.request.user,
+            )
+            instance.delete()
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="calendar.ics",
+        renderer_classes=[ICalendarRenderer, JSONRenderer],
+    )
+    def calendar(self, request):
+        return calendar_response(
+            self.get_queryset(),
+            request,
+            f"Bookings of {request.user.username}",
+            lambda row: f"{row[4]} booked by {row[6]}",
+        )
+
+    @action(detail=False, methods=["get"], url_path="changes")
+    def changes(self, request):
+        """
+        Without ``sync_token``, return all visible bookings and a token;
+        with it, only the bookings created, changed or deleted since.
+        """
+        bookings = self.get_queryset()
+        changes = BookingChange.objects.filter(
+            room_id__in=Room.objects.filter(office_id=self.office_id).values("id")
+        )
+        if not request.user.is_staff:
+            changes = changes.filter(user_id=request.user.id)
+        room = request.query_params.get("room")
+        if room:
+            if not room.isdigit():
+                return Response({"detail": "Invalid room."}, status=400)
+            bookings = bookings.filter(room_id=room)
+            changes = changes.filter(room_id=room)
+
+        token = request.query_params.get("sync_token")
+        if token and not token.isdigit():
+            return Response({"detail": "Invalid sync_token."}, status=400)
+        values_serializer = self.get_values_serializer()
+        # Token 0, handed out while the log was empty, has seen nothing: its
+        # changes may have been pruned since, so it gets a full sync too.
+        if not token or int(token) == 0:
+            token = current_token()
+            rows = values_serializer.values(bookings.order_by("id"))
+            return Response(
+                {
+                    "sync_token": str(token),
+                    "upserted": values_serializer.to_representation(rows),
+                    "deleted": [],
+                    "has_more": False,
+                }
+            )
+        try:
+            token, upserted, deleted, has_more = changes_since(
+                changes, int(token), SYNC_PAGE_SIZE
+            )
+        except SyncTokenExpired:
+            return Response(
+                {"detail": "sync_token expired, sync again without a token."},
+                status=410,
+            )
+        rows = values_serializer.values(bookings.filter(pk__in=upserted).order_by("id"))
+        return Response(
+            {
+                "sync_token": str(token),
+                "upserted": values_serializer.to_representation(rows),
+                "deleted": deleted,
+                "has_more": has_more,
+            }
+        )
+
+
+class WaitlistViewSet(
+    OfficeScopedMixin,
+    ValuesListMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Waiting for a booked room. When an overlapping booking is deleted or
+    shrunk, the oldest entries that fit are booked for their users.
+    """
+
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return WaitlistEntry.objects.none()
+        entries = WaitlistEntry.objects.filter(room__office_id=self.office_id).order_by(
+            "created_at", "id"
+        )
         if self.request.user.is_staff:
-            return Booking.objects.all()
-        return Booking.objects.filter(user=self.request.user)
+            return entries
+        return entries.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         user = self.request.user
-        room = serializer.validated_data["room"]
-        date = serializer.validated_data["date"]
-        start_time = serializer.validated_data["start_time"]
-        end_time = serializer.validated_data["end_time"]
+        data = serializer.validated_data
+        room, start, end = data["room"], data["start"], data["end"]
+        if start <= timezone.now():
+            raise ValidationError("Only future time slots can be waited for.")
         with transaction.atomic():
-            # Lock the Room row to serialize booking creation for this room
-            Room.objects.select_for_update().get(pk=room.pk)
-            # Check for overlapping booking in the same room
-            overlap = Booking.objects.filter(
-                room=room, date=date, start_time__lt=end_time, end_time__gt=start_time
-            ).exists()
-            if overlap:
-                raise ValidationError("Room already booked for this time slot.")
-            # Check if user already has booking for this time
-            user_overlap = Booking.objects.filter(
-                user=user, date=date, start_time__lt=end_time, end_time__gt=start_time
-            ).exists()
-            if user_overlap:
-                raise ValidationError("You already have a booking at this time.")
+            # Serializes with bookings and promotions in this room.
+            if Room.objects.select_for_update().get(pk=room.pk).deleting:
+                raise ValidationError("Room is being deleted.")
+            if not Booking.objects.filter(room=room).overlapping(start, end).exists():
+                raise ValidationError("Room is available for this time slot.")
+            if WaitlistEntry.objects.filter(
+                user=user, room=room, start=start, end=end
+            ).exists():
+                raise ValidationError("You are already waiting for this time slot.")
             serializer.save(user=user)
@@ -0,0 +1,104 @@
+"""
+Waitlist promotion.
+
+When a booking is deleted or shrunk, ``promote`` books the waitlist entries
+of its room that overlap the freed periods and now fit, oldest first. The
+candidates come from one ``&&`` query on the waitlist's GiST index and are
+checked against the room's bookings in memory, so the cost follows the
+entries overlapping the freed periods rather than the size of the waitlist.
+"""
+
+from django.db import transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import Q
+from django.utils import timezone
+from jobs.queue import enqueue
+from rooms.availability import busy_index, merge_periods
+from rooms.models import Room
+
+from .models import Booking, WaitlistEntry
+from .quotas import QuotaExceeded, check_quota
+
+
+def freed_periods(previous, current):
+    """
+    Return the parts of ``previous`` (``(room_id, start, end)``) that are no
+    longer booked as ``current``.
+    """
+    room_id, start, end = previous
+    if current[0] != room_id:
+        return [(start, end)]
+    periods = []
+    if start < current[1]:
+        periods.append((start, min(end, current[1])))
+    if current[2] < end:
+        periods.append((max(start, current[2]), end))
+    return periods
+
+
+def promote(room_id, periods):
+    """
+    Book waitlist entries of ``room_id`` overlapping the freed ``periods``
+    that fit now, in the order they were added, and return the bookings.
+
+    Entries whose user has an overlapping booking or would exceed a quota
+    stay on the waitlist.
+    """
+    condition = Q()
+    for start, end in merge_periods(periods):
+        condition |= Q(period__overlap=DateTimeTZRange(start, end))
+    if not condition:
+        return []
+    # Imported here: tasks imports signals, which import this module.
+    from .tasks import notification_payload
+
+    promoted = []
+    with transaction.atomic():
+        # Same lock as booking writes, which check the room's bookings.
+        room = Room.objects.select_for_update().filter(pk=room_id).first()
+        if room is None:
+            return promoted
+        entries = list(
+            WaitlistEntry.objects.filter(room=room, start__gt=timezone.now())
+            .with_period()
+            .filter(condition)
+            .select_related("user")
+            .order_by("created_at", "id")
+        )
+        if not entries:
+            return promoted
+        busy = busy_index([room], [(entry.start, entry.end) for entry in entries])
+        for entry in entries:
+            if not busy.is_free(room.pk, entry.start, entry.end) or any(
+                booking.start < entry.end and entry.start < booking.end
+                for booking in promoted
+            ):
+                continue
+            user = entry.user
+            if (
+                Booking.objects.filter(user=user)
+                .overlapping(entry.start, entry.end)
+                .exists()
+            ):
+                continue
+            if not user.is_staff:
+                try:
+                    check_quota(user, entry.start, entry.end)
+                except QuotaExceeded:
+                    continue
+            booking = Booking.objects.create(
+                user=user, room=room, start=entry.start, end=entry.end
+            )
+            entry.delete()
+            enqueue(
+                "bookings.notify",
+                notification_payload(booking, "created from the waitlist"),
+                user=user,
+            )
+            promoted.append(booking)
+    return promoted
+
+
+def prune_entries():
+    """Delete entries whose period has started; they can no longer be booked."""
+    return WaitlistEntry.objects.filter(start__lte=timezone.now()).delete()[0]
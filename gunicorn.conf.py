@@ -0,0 +1,30 @@
+"""
+gunicorn configuration for production; gunicorn reads it from the working
+directory, so ``gunicorn`` alone starts the API.
+
+Workers default to ``2 * CPUs + 1`` of the CPUs this process may run on.
+Every ``GUNICORN_*`` variable below overrides its default.
+"""
+
+import os
+
+raw_env = [
+    'DJANGO_SETTINGS_MODULE='
+    + os.environ.get('DJANGO_SETTINGS_MODULE', 'meetingroom_api.settings_production')
+]
+wsgi_app = 'meetingroom_api.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+workers = int(os.environ.get('GUNICORN_WORKERS', 2 * cpus + 1))
+# Threads share a worker's memory; each keeps its own database connection.
+threads = int(os.environ.get('GUNICORN_THREADS', 2))
+worker_class = 'gthread'
+
+# Import Django once in the master; workers are forked with it loaded.
+preload_app = True
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+# Recycle workers now and then to bound memory growth.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import prune_jobs
+
+
+class Command(BaseCommand):
+    help = "Delete done and failed jobs that finished more than --days ago."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30)
+
+    def handle(self, *args, **options):
+        deleted = prune_jobs(timedelta(days=options["days"]))
+        if options["verbosity"]:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} jobs"))
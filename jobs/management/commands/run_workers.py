@@ -0,0 +1,114 @@
+import multiprocessing
+import os
+import signal
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs.queue import claim_job, requeue_stale, run_job
+
+# Seconds between checks for jobs left running by a worker that died.
+REQUEUE_INTERVAL = 60
+STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+_stopping = False
+
+
+def _stop(signum, frame):
+    global _stopping
+    _stopping = True
+
+
+def work(poll_interval, burst, stale_after=timedelta(hours=1)):
+    """
+    Claim and run jobs until stopped (or, in burst mode, until idle). SIGTERM
+    and SIGINT stop the worker once its current job has finished.
+    """
+    global _stopping
+    _stopping = False
+    previous = {signum: signal.signal(signum, _stop) for signum in STOP_SIGNALS}
+    processed = 0
+    next_requeue = time.monotonic() + REQUEUE_INTERVAL
+    try:
+        while not _stopping:
+            job = claim_job()
+            if job is not None:
+                run_job(job)
+                processed += 1
+            elif burst:
+                break
+            else:
+                # Drop connections that went stale or exceeded CONN_MAX_AGE
+                # while idle.
+                close_old_connections()
+                if time.monotonic() >= next_requeue:
+                    requeue_stale(stale_after)
+                    next_requeue = time.monotonic() + REQUEUE_INTERVAL
+                time.sleep(poll_interval)
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+    return processed
+
+
+class Command(BaseCommand):
+    help = "Run background job workers (no external broker needed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of worker processes; 1 runs in the current process.",
+        )
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once there are no due jobs left.",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=3600,
+            help=(
+                "Requeue jobs that have been running for this many seconds, at "
+                "startup and then every minute while idle."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options["stale_after"])
+        requeued = requeue_stale(stale_after)
+        if requeued and options["verbosity"]:
+            self.stdout.write(f"Requeued {requeued} stale jobs")
+        worker_args = (options["poll_interval"], options["burst"], stale_after)
+        if options["workers"] <= 1:
+            processed = work(*worker_args)
+            if options["verbosity"]:
+                self.stdout.write(f"Processed {processed} jobs")
+            return
+
+        # Forked workers must not share the parent's database connections.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=work, args=worker_args, daemon=True)
+            for _ in range(options["workers"])
+        ]
+        for process in processes:
+            process.start()
+
+        def stop(signum, frame):
+            # Workers stop after their current job; see ``work``.
+            for process in processes:
+                if process.is_alive():
+                    os.kill(process.pid, signal.SIGTERM)
+
+        # Installed after forking, so that workers start with the defaults.
+        for signum in STOP_SIGNALS:
+            signal.signal(signum, stop)
+        for process in processes:
+            process.join()
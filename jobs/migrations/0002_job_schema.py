@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="schema",
+            field=models.CharField(blank=True, max_length=63),
+        ),
+    ]
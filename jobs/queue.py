@@ -0,0 +1,118 @@
+"""
+A small database-backed job queue.
+
+Handlers are registered by name in each app's ``tasks`` module and run by
+``manage.py run_workers``. Jobs are claimed with ``SELECT ... FOR UPDATE SKIP
+LOCKED`` so any number of worker processes can share the table.
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from offices.schemas import active_schema, use_schema
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+RETRY_DELAY = timedelta(seconds=30)
+
+
+def register(name):
+    """Register the decorated function as the handler for jobs named ``name``."""
+
+    def decorator(func):
+        HANDLERS[name] = func
+        return func
+
+    return decorator
+
+
+def enqueue(name, payload=None, user=None, **kwargs):
+    """
+    Create a pending job. Inside a transaction the job only becomes visible to
+    workers once the transaction commits. The job runs in the office schema
+    active when it was enqueued.
+    """
+    if name not in HANDLERS:
+        raise KeyError(f"No job handler registered for {name!r}")
+    kwargs.setdefault("schema", active_schema())
+    return Job.objects.create(
+        name=name, payload=payload or {}, created_by=user, **kwargs
+    )
+
+
+def claim_job():
+    """Mark the next due pending job as running and return it, or ``None``."""
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.PENDING, run_after__lte=now)
+            .order_by("run_after", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = Job.Status.RUNNING
+        job.attempts += 1
+        job.started_at = now
+        job.save(update_fields=["status", "attempts", "started_at"])
+    return job
+
+
+def run_job(job):
+    """
+    Run a claimed job's handler. Failed jobs are retried after ``RETRY_DELAY``
+    until ``max_attempts`` is reached.
+    """
+    try:
+        with use_schema(job.schema):
+            result = HANDLERS[job.name](job)
+    except Exception:
+        logger.exception("Job %s failed", job)
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.Status.PENDING
+            job.run_after = timezone.now() + RETRY_DELAY * job.attempts
+        else:
+            job.status = Job.Status.FAILED
+            job.finished_at = timezone.now()
+    else:
+        job.status = Job.Status.DONE
+        job.result = result
+        job.error = ""
+        job.finished_at = timezone.now()
+    job.save(update_fields=["status", "result", "error", "run_after", "finished_at"])
+    return job
+
+
+def run_pending(limit=None):
+    """Run due jobs in the current process until none are left (or ``limit``)."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def requeue_stale(timeout):
+    """Return jobs left running by a worker that died to the pending state."""
+    return Job.objects.filter(
+        status=Job.Status.RUNNING, started_at__lt=timezone.now() - timeout
+    ).update(status=Job.Status.PENDING)
+
+
+def prune_jobs(older_than):
+    """Delete done and failed jobs that finished more than ``older_than`` ago."""
+    return Job.objects.filter(
+        status__in=[Job.Status.DONE, Job.Status.FAILED],
+        finished_at__lt=timezone.now() - older_than,
+    ).delete()[0]
@@ -0,0 +1,145 @@
+import os
+import signal
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from bookings.models import Booking, RoomDayUsage
+from bookings.tests import period
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rooms.models import Room
+
+from .management.commands.run_workers import work
+from .models import Job
+from .views import JobPagination
+from .queue import HANDLERS, enqueue, register, run_pending
+
+
+class JobQueueTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("user1", "user1@test.com", "pass")
+        self.other = User.objects.create_user("user2", "user2@test.com", "pass")
+        self.room = Room.objects.create(name="Room A", capacity=4, floor=1)
+
+        @register("tests.echo")
+        def echo(job):
+            job.report_progress(step=1)
+            return job.payload
+
+        @register("tests.fail")
+        def fail(job):
+            raise RuntimeError("boom")
+
+        self.addCleanup(HANDLERS.pop, "tests.echo")
+        self.addCleanup(HANDLERS.pop, "tests.fail")
+
+    def test_run_job_and_expose_status(self):
+        job = enqueue("tests.echo", {"value": 1}, user=self.user)
+        self.assertEqual(run_pending(), 1)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse("job-detail", args=[job.pk]))
+        self.assertEqual(response.data["status"], "done")
+        self.assertEqual(response.data["result"], {"value": 1})
+        self.assertEqual(response.data["progress"], {"step": 1})
+        # Jobs are only visible to their creator and admins
+        self.client.force_authenticate(user=self.other)
+        response = self.client.get(reverse("job-detail", args=[job.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        job = enqueue("tests.fail", max_attempts=2)
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.PENDING)
+        self.assertIn("boom", job.error)
+        Job.objects.filter(pk=job.pk).update(run_after=job.created_at)
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_jobs_list_is_paginated(self):
+        jobs = [enqueue("tests.echo", user=self.user) for _ in range(3)]
+        self.client.force_authenticate(user=self.user)
+        with patch.object(JobPagination, "page_size", 2):
+            response = self.client.get(reverse("job-list"))
+            self.assertEqual(
+                [job["id"] for job in response.data["results"]],
+                [jobs[2].pk, jobs[1].pk],
+            )
+            response = self.client.get(response.data["next"])
+        self.assertEqual([job["id"] for job in response.data["results"]], [jobs[0].pk])
+        self.assertIsNone(response.data["next"])
+
+    def test_prune_finished_jobs(self):
+        later = timezone.now() + timedelta(days=1)
+        done = enqueue("tests.echo")
+        failed = enqueue("tests.fail", max_attempts=1)
+        pending = enqueue("tests.echo", run_after=later)
+        run_pending()
+        Job.objects.filter(pk__in=[done.pk, failed.pk]).update(
+            finished_at=timezone.now() - timedelta(days=31)
+        )
+        recent = enqueue("tests.echo")
+        run_pending()
+        call_command("prune_jobs", verbosity=0)
+        self.assertEqual(
+            set(Job.objects.values_list("pk", flat=True)), {pending.pk, recent.pk}
+        )
+
+    def test_unknown_job_name(self):
+        with self.assertRaises(KeyError):
+            enqueue("tests.missing")
+
+    def test_delete_user_in_batches(self):
+        for hour in range(9, 14):
+            Booking.objects.create(
+                user=self.user,
+                room=self.room,
+                **period(date(2025, 5, 1), f"{hour}:00", f"{hour}:30"),
+            )
+        enqueue("users.delete", {"user_id": self.user.pk, "batch_size": 2})
+        run_pending()
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(RoomDayUsage.objects.exists())
+
+    def test_booking_notifications(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            reverse("booking-list"),
+            {
+                "room": self.room.id,
+                "date": "2025-05-01",
+                "start_time": "10:00",
+                "end_time": "11:00",
+            },
+        )
+        self.client.delete(reverse("booking-detail", args=[response.data["id"]]))
+        self.assertEqual(len(mail.outbox), 0)
+        run_pending()
+        self.assertEqual(
+            [message.subject for message in mail.outbox],
+            ["Booking created: Room A", "Booking cancelled: Room A"],
+        )
+        self.assertEqual(mail.outbox[0].to, ["user1@test.com"])
+
+    def test_worker_finishes_current_job_on_sigterm(self):
+        @register("tests.sigterm")
+        def sigterm(job):
+            os.kill(os.getpid(), signal.SIGTERM)
+            return "finished"
+
+        self.addCleanup(HANDLERS.pop, "tests.sigterm")
+        first = enqueue("tests.sigterm")
+        second = enqueue("tests.echo")
+        self.assertEqual(work(poll_interval=0, burst=True), 1)
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.result), (Job.Status.DONE, "finished"))
+        second.refresh_from_db()
+        self.assertEqual(second.status, Job.Status.PENDING)
+        self.assertEqual(signal.getsignal(signal.SIGTERM), signal.SIG_DFL)
@@ -0,0 +1,26 @@
+from rest_framework import permissions, viewsets
+from rest_framework.pagination import CursorPagination
+
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobPagination(CursorPagination):
+    """Newest jobs first, paged by id without counting the table."""
+
+    ordering = "-id"
+    page_size = 50
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = JobPagination
+
+    def get_queryset(self):
+        jobs = Job.objects.order_by("-id")
+        if getattr(self, "swagger_fake_view", False):
+            return jobs.none()
+        if self.request.user.is_staff:
+            return jobs
+        return jobs.filter(created_by=self.request.user)
@@ -0,0 +1,144 @@
+from functools import lru_cache
+from operator import methodcaller
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+# Fields whose representation of a ``values()`` value is the value itself.
+_PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.ReadOnlyField,
+)
+
+
+def _iso_converter(field, default_format):
+    output_format = getattr(field, "format", default_format)
+    if output_format is not None and output_format.lower() == ISO_8601:
+        return methodcaller("isoformat")
+    return field.to_representation
+
+
+def _build_converter(field):
+    """
+    Return a callable turning a raw ``values()`` value into the field's
+    representation, or ``None`` when the raw value can be emitted as is.
+    """
+    if isinstance(field, serializers.DateTimeField):
+        return field.to_representation
+    if isinstance(field, serializers.DateField):
+        return _iso_converter(field, api_settings.DATE_FORMAT)
+    if isinstance(field, serializers.TimeField):
+        return _iso_converter(field, api_settings.TIME_FORMAT)
+    if isinstance(field, _PASSTHROUGH_FIELDS):
+        return None
+    return field.to_representation
+
+
+def _composite_reader(index, width, from_values):
+    def read(row):
+        return from_values(*row[index : index + width])
+
+    return read
+
+
+def _column_reader(index, convert):
+    def read(row):
+        value = row[index]
+        return value if value is None or convert is None else convert(value)
+
+    return read
+
+
+class ValuesSerializer:
+    """
+    Read-only counterpart of a ``ModelSerializer`` that works on
+    ``QuerySet.values_list()`` rows instead of model instances.
+
+    Field lookups and converters are derived once from the serializer's
+    fields, so the output is the same as ``serializer_class(many=True).data``.
+    Fields computed from several values declare them as ``values_sources``
+    and build their representation in ``from_values(*values)``.
+    """
+
+    def __init__(self, serializer_class):
+        self.names = []
+        self.lookups = []
+        self.converters = []
+        self.readers = []
+        self.composite = False
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            sources = getattr(field, "values_sources", None)
+            if sources:
+                self.composite = True
+                self.readers.append(
+                    _composite_reader(
+                        len(self.lookups), len(sources), field.from_values
+                    )
+                )
+                self.lookups.extend(sources)
+            elif field.source == "*" or isinstance(field, serializers.SerializerMethodField):
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{name} cannot be read from values()."
+                )
+            else:
+                convert = _build_converter(field)
+                self.converters.append(convert)
+                self.readers.append(_column_reader(len(self.lookups), convert))
+                self.lookups.append(field.source.replace(".", "__"))
+            self.names.append(name)
+
+    def values(self, queryset):
+        return queryset.values_list(*self.lookups)
+
+    def to_representation(self, rows):
+        if self.composite:
+            readers = list(zip(self.names, self.readers))
+            return [{name: read(row) for name, read in readers} for row in rows]
+        fields = list(zip(self.names, self.converters))
+        return [
+            {
+                name: value if value is None or convert is None else convert(value)
+                for (name, convert), value in zip(fields, row)
+            }
+            for row in rows
+        ]
+
+
+@lru_cache(maxsize=None)
+def values_serializer_for(serializer_class):
+    return ValuesSerializer(serializer_class)
+
+
+class ValuesListMixin:
+    """
+    Serve ``list`` through a ``ValuesSerializer`` built from the viewset's
+    serializer class, skipping model instantiation for read-only lists.
+    """
+
+    def get_values_serializer(self):
+        return values_serializer_for(self.get_serializer_class())
+
+    def get_values_response(self, queryset):
+        if not queryset.ordered:
+            # Joins for related fields (e.g. ``room.name``) would otherwise let
+            # the database return rows in a different order than before.
+            queryset = queryset.order_by("pk")
+        values_serializer = self.get_values_serializer()
+        rows = values_serializer.values(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                values_serializer.to_representation(page)
+            )
+        return Response(values_serializer.to_representation(rows))
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.get_values_response(queryset)
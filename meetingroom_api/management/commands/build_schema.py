@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from meetingroom_api.schema import generate_schema
+
+
+class Command(BaseCommand):
+    help = "Write the OpenAPI document served at /swagger.json."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=settings.OPENAPI_SCHEMA_PATH,
+            help="Defaults to the OPENAPI_SCHEMA_PATH setting.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["output"])
+        path.write_bytes(generate_schema())
+        if options["verbosity"]:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
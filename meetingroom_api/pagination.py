@@ -0,0 +1,54 @@
+"""
+Pagination for admin changelists of large tables.
+
+``COUNT(*)`` reads the whole table on PostgreSQL. For unfiltered querysets
+``EstimatedCountPaginator`` uses the row estimate the planner keeps in
+``pg_class.reltuples`` (refreshed by ``ANALYZE``/autovacuum) instead, so the
+page count may be off by the rows changed since; the last pages are then
+short or empty.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset):
+    """
+    Return the planner's row estimate for an unfiltered ``queryset``, or
+    ``None`` when there is none to use.
+    """
+    query = queryset.query
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql" or query.where or query.distinct:
+        return None
+    table = connection.ops.quote_name(queryset.model._meta.db_table)
+    with connection.cursor() as cursor:
+        # ``to_regclass`` resolves the table through the search path.
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+            [table],
+        )
+        row = cursor.fetchone()
+    # -1 until the table is first analyzed.
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts unfiltered querysets from the planner's estimate once it reaches
+    ``estimate_threshold`` rows; smaller or filtered ones are counted exactly.
+    """
+
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            estimate = estimated_count(self.object_list)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,120 @@
+"""
+OpenAPI document of the API.
+
+``manage.py build_schema`` writes it to ``OPENAPI_SCHEMA_PATH`` at build time
+and ``schema_json`` serves that file with an ETag, instead of introspecting
+every viewset per request. Without the file the document is generated on the
+first request and kept for the life of the process.
+
+``drf_yasg`` is imported on first use only; it is slow to import and not
+needed to serve the precompiled file. Views describe themselves with the
+``schema`` decorator below instead of ``swagger_auto_schema``.
+"""
+
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.cache import cache_control
+from django.urls import get_resolver
+from django.views.decorators.http import etag, require_safe
+from rest_framework import permissions
+
+# View methods decorated with ``schema``, in definition order.
+_documented = []
+
+
+def schema(query_parameters=(), **details):
+    """
+    Record ``swagger_auto_schema`` arguments for a view method, applied when
+    the document is generated. ``query_parameters`` are ``(name, type,
+    description)`` tuples, ``type`` being an OpenAPI type such as ``"string"``.
+    Place it above ``@action``, like ``swagger_auto_schema``.
+    """
+
+    def decorator(view_method):
+        view_method._schema_details = (query_parameters, details)
+        _documented.append(view_method)
+        return view_method
+
+    return decorator
+
+
+@lru_cache(maxsize=None)
+def _document_views():
+    from drf_yasg import openapi
+    from drf_yasg.utils import swagger_auto_schema
+
+    # Imports every view module, so that all ``schema`` details are recorded.
+    get_resolver().url_patterns
+    for view_method in _documented:
+        query_parameters, details = view_method._schema_details
+        manual_parameters = [
+            openapi.Parameter(
+                name,
+                openapi.IN_QUERY,
+                description=description,
+                type=type_,
+                required=False,
+            )
+            for name, type_, description in query_parameters
+        ]
+        if manual_parameters:
+            details = {**details, "manual_parameters": manual_parameters}
+        swagger_auto_schema(**details)(view_method)
+
+
+@lru_cache(maxsize=None)
+def api_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Meeting Room Booking API",
+        default_version="v1",
+        description="API for booking meeting rooms in an office",
+    )
+
+
+def generate_schema():
+    """Return the document as JSON bytes."""
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    _document_views()
+    schema = OpenAPISchemaGenerator(api_info()).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+@lru_cache(maxsize=None)
+def load_schema():
+    """Return ``(content, etag)`` of the precompiled or generated document."""
+    try:
+        content = Path(settings.OPENAPI_SCHEMA_PATH).read_bytes()
+    except FileNotFoundError:
+        content = generate_schema()
+    return content, hashlib.sha256(content).hexdigest()
+
+
+@require_safe
+@cache_control(public=True, no_cache=True)
+@etag(lambda request: load_schema()[1])
+def schema_json(request):
+    return HttpResponse(load_schema()[0], content_type="application/json")
+
+
+@lru_cache(maxsize=None)
+def _swagger_ui_view():
+    from drf_yasg.views import get_schema_view
+
+    _document_views()
+    schema_view = get_schema_view(
+        api_info(), public=True, permission_classes=(permissions.AllowAny,)
+    )
+    return schema_view.with_ui("swagger")
+
+
+def swagger_ui(request, *args, **kwargs):
+    """Swagger UI, reading the document from ``schema_json``."""
+    return _swagger_ui_view()(request, *args, **kwargs)
@@ -28,23 +28,33 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# Optional components. Leaving them out shortens worker start-up; the OpenAPI
+# document stays available at /swagger.json either way.
+ADMIN_ENABLED = os.environ.get('ADMIN_ENABLED', '1') == '1'
+SWAGGER_UI_ENABLED = os.environ.get('SWAGGER_UI_ENABLED', '1') == '1'
 
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
-    'drf_yasg',
+    'meetingroom_api',
     'rooms',
     'bookings',
+    'jobs',
+    'offices',
     'django_filters',  # added django_filters
 ]
+if ADMIN_ENABLED:
+    INSTALLED_APPS.insert(0, 'django.contrib.admin')
+if SWAGGER_UI_ENABLED:
+    INSTALLED_APPS.append('drf_yasg')
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -91,6 +101,10 @@ DATABASES = {
     }
 }
 
+# Offices with their own schema keep their rooms and bookings there; see
+# offices.schemas.
+DATABASE_ROUTERS = ['offices.routers.OfficeSchemaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -128,6 +142,20 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Email (booking notifications are sent from background jobs)
+EMAIL_BACKEND = os.environ.get(
+    'EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend'
+)
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'bookings@localhost')
+
+# Per-user booking quotas for non-staff users; 0 disables a quota.
+BOOKING_MAX_HOURS_PER_WEEK = int(os.environ.get('BOOKING_MAX_HOURS_PER_WEEK', 40))
+BOOKING_MAX_UPCOMING = int(os.environ.get('BOOKING_MAX_UPCOMING', 20))
+BOOKING_MAX_LEAD_DAYS = int(os.environ.get('BOOKING_MAX_LEAD_DAYS', 90))
+
+# How long responses to booking writes with an Idempotency-Key are replayed.
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -147,15 +175,22 @@ REST_FRAMEWORK = {
         'rest_framework.throttling.AnonRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
-        'user': '100/minute',
-        'anon': '10/minute',
+        'user': os.environ.get('THROTTLE_RATE_USER', '100/minute'),
+        'anon': os.environ.get('THROTTLE_RATE_ANON', '10/minute'),
     },
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
 }
 
+# OpenAPI document written by `manage.py build_schema` and served at
+# /swagger.json; generated on first request when the file is missing.
+OPENAPI_SCHEMA_PATH = os.environ.get(
+    'OPENAPI_SCHEMA_PATH', str(BASE_DIR / 'openapi.json')
+)
+
 SWAGGER_SETTINGS = {
+    'SPEC_URL': 'schema-json',
     'SECURITY_DEFINITIONS': {
         'Bearer': {
             'type': 'apiKey',
@@ -171,4 +206,6 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Adds the user's office to tokens, for scoping requests without a query.
+    'TOKEN_OBTAIN_SERIALIZER': 'offices.tokens.OfficeTokenObtainPairSerializer',
 }
@@ -0,0 +1,45 @@
+"""
+Production settings, used by gunicorn (see ``gunicorn.conf.py``).
+
+Everything not overridden here comes from ``settings``. ``SECRET_KEY`` and
+``ALLOWED_HOSTS`` (comma-separated) must be set in the environment.
+"""
+
+import os
+
+# The admin and the Swagger UI are left out unless asked for (ADMIN_ENABLED=1,
+# SWAGGER_UI_ENABLED=1); /swagger.json is still served.
+os.environ.setdefault('ADMIN_ENABLED', '0')
+os.environ.setdefault('SWAGGER_UI_ENABLED', '0')
+
+from .settings import *  # noqa: E402,F401,F403
+from .settings import DATABASES, REST_FRAMEWORK, TEMPLATES  # noqa: E402
+
+SECRET_KEY = os.environ['SECRET_KEY']
+
+# With DEBUG on, every query is kept in connection.queries.
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    host.strip() for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host.strip()
+]
+
+# Keep connections open between requests instead of reconnecting each time.
+DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    (
+        'django.template.loaders.cached.Loader',
+        [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ],
+    ),
+]
+
+# JSON only: the browsable API renders a full HTML page per response.
+REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = (
+    'rest_framework.renderers.JSONRenderer',
+)
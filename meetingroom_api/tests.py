@@ -0,0 +1,41 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .schema import load_schema
+
+
+class SchemaTests(TestCase):
+    def setUp(self):
+        load_schema.cache_clear()
+        self.addCleanup(load_schema.cache_clear)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "openapi.json"
+
+    def test_build_schema_is_served_with_etag(self):
+        call_command("build_schema", output=str(self.path), verbosity=0)
+        with override_settings(OPENAPI_SCHEMA_PATH=str(self.path)):
+            response = self.client.get(reverse("schema-json"))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, self.path.read_bytes())
+            self.assertIn("/rooms/available/", json.loads(response.content)["paths"])
+            self.assertIn("no-cache", response["Cache-Control"])
+
+            response = self.client.get(
+                reverse("schema-json"), HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+            self.assertEqual(response.status_code, 304)
+
+    def test_schema_is_generated_once_without_file(self):
+        with override_settings(OPENAPI_SCHEMA_PATH=str(self.path)):
+            first = self.client.get(reverse("schema-json"))
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(json.loads(first.content)["info"]["version"], "v1")
+            self.path.write_text("{}")
+            second = self.client.get(reverse("schema-json"))
+            self.assertEqual(second["ETag"], first["ETag"])
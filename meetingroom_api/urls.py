@@ -14,37 +14,58 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 from rooms.views import RoomViewSet
-from bookings.views import BookingViewSet
+from bookings.views import BookingViewSet, WaitlistViewSet
+from jobs.views import JobViewSet
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from meetingroom_api.schema import schema_json, swagger_ui
 from meetingroom_api.views import RegisterView, UserDetailView
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework import permissions
 
 router = DefaultRouter()
 router.register(r'rooms', RoomViewSet, basename='room')
+# Before bookings, whose detail route would otherwise match "waitlist".
+router.register(r'bookings/waitlist', WaitlistViewSet, basename='waitlist')
 router.register(r'bookings', BookingViewSet, basename='booking')
+router.register(r'jobs', JobViewSet, basename='job')
+
+
+def calendar_feed(viewset, basename, detail):
+    # The router only builds "calendar.ics/"; calendar clients subscribe to
+    # the exact ".ics" URL, which the detail route would otherwise match.
+    return viewset.as_view(
+        {'get': 'calendar'},
+        basename=basename,
+        detail=detail,
+        **viewset.calendar.kwargs,
+    )
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Meeting Room Booking API",
-        default_version='v1',
-        description="API for booking meeting rooms in an office",
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    re_path(
+        r'^api/bookings/calendar\.ics$',
+        calendar_feed(BookingViewSet, 'booking', detail=False),
+        name='booking-calendar-feed',
+    ),
+    re_path(
+        r'^api/rooms/(?P<pk>[^/.]+)/calendar\.ics$',
+        calendar_feed(RoomViewSet, 'room', detail=True),
+        name='room-calendar-feed',
+    ),
     path('api/', include(router.urls)),
     path('api/auth/register/', RegisterView.as_view(), name='register'),
     path('api/auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/auth/user/', UserDetailView.as_view(), name='user_detail'),
-    path('swagger/', schema_view.with_ui('swagger'), name='schema-swagger-ui'),
+    path('swagger.json', schema_json, name='schema-json'),
 ]
+
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
+
+if settings.SWAGGER_UI_ENABLED:
+    urlpatterns.append(path('swagger/', swagger_ui, name='schema-swagger-ui'))
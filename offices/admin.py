@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import Membership, Office
+
+
+@admin.register(Office)
+class OfficeAdmin(admin.ModelAdmin):
+    list_display = ("name", "slug", "schema")
+    search_fields = ("name", "slug")
+    prepopulated_fields = {"slug": ("name",)}
+
+
+@admin.register(Membership)
+class MembershipAdmin(admin.ModelAdmin):
+    list_display = ("user", "office")
+    list_filter = ("office",)
+    search_fields = ("user__username",)
+    raw_id_fields = ("user",)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class OfficesConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "offices"
+
+    def ready(self):
+        from . import schemas  # noqa: F401
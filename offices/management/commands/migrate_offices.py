@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from offices.models import Office
+from offices.schemas import migrate_schema
+
+
+class Command(BaseCommand):
+    help = "Create and migrate the schemas of offices that have one."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--office",
+            action="append",
+            dest="slugs",
+            help="Slug of an office to migrate (repeatable; default: all).",
+        )
+
+    def handle(self, *args, **options):
+        offices = Office.objects.exclude(schema="").order_by("slug")
+        if options["slugs"]:
+            offices = offices.filter(slug__in=options["slugs"])
+            missing = set(options["slugs"]) - {office.slug for office in offices}
+            if missing:
+                raise CommandError(
+                    f"No office with a schema for: {', '.join(sorted(missing))}"
+                )
+        for office in offices:
+            if options["verbosity"]:
+                self.stdout.write(f"Migrating {office.slug} ({office.schema})")
+            migrate_schema(office.schema, verbosity=max(options["verbosity"] - 1, 0))
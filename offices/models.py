@@ -0,0 +1,44 @@
+import re
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models
+
+SCHEMA_NAME = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+
+
+def validate_schema_name(value):
+    if not SCHEMA_NAME.match(value) or value == "public" or value.startswith("pg_"):
+        raise ValidationError(f"Invalid schema name {value!r}.")
+
+
+class Office(models.Model):
+    """
+    A tenant. Rooms and bookings belong to one office; those without an
+    office form the default office of single-tenant deployments.
+
+    With ``schema`` set, the office's rooms and bookings live in that
+    PostgreSQL schema (created by ``manage.py migrate_offices``) instead of
+    the shared tables.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(unique=True)
+    schema = models.CharField(
+        max_length=63, blank=True, validators=[validate_schema_name]
+    )
+
+    def __str__(self):
+        return self.name
+
+
+class Membership(models.Model):
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="membership"
+    )
+    office = models.ForeignKey(
+        Office, on_delete=models.CASCADE, related_name="memberships"
+    )
+
+    def __str__(self):
+        return f"{self.user} in {self.office}"
@@ -0,0 +1,16 @@
+from django.db import connections
+
+from .schemas import SCHEMA_SETTING, TENANT_APPS
+
+
+class OfficeSchemaRouter:
+    """
+    Only migrate ``TENANT_APPS`` into office schemas; other tables stay
+    shared in ``public``. Queries are not routed: offices switch schemas on
+    the default connection (see ``offices.schemas``).
+    """
+
+    def allow_migrate(self, db, app_label, **hints):
+        if connections[db].settings_dict.get(SCHEMA_SETTING):
+            return app_label in TENANT_APPS
+        return None
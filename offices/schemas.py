@@ -0,0 +1,91 @@
+"""
+Per-office PostgreSQL schemas.
+
+An office with a ``schema`` keeps the tables of ``TENANT_APPS`` in that
+schema. ``use_schema`` puts it first on the default connection's
+``search_path``, so that the same queries and transactions run against the
+office's tables while shared tables (users, offices, jobs) are still found
+in ``public``.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+TENANT_APPS = {"rooms", "bookings"}
+# Marks the connection settings of an office schema for ``OfficeSchemaRouter``.
+SCHEMA_SETTING = "OFFICE_SCHEMA"
+
+_active_schema = ContextVar("office_schema", default="")
+
+
+def active_schema():
+    return _active_schema.get()
+
+
+def _set_search_path(cursor, schema):
+    if schema:
+        cursor.execute(
+            f"SET search_path TO {connection.ops.quote_name(schema)}, public"
+        )
+    else:
+        cursor.execute("RESET search_path")
+
+
+@contextmanager
+def use_schema(schema):
+    """Run queries of the default connection in ``schema`` ("" for public)."""
+    previous = _active_schema.get()
+    if schema == previous:
+        yield
+        return
+    token = _active_schema.set(schema)
+    with connection.cursor() as cursor:
+        _set_search_path(cursor, schema)
+    try:
+        yield
+    finally:
+        _active_schema.reset(token)
+        if connection.connection is not None:
+            with connection.cursor() as cursor:
+                _set_search_path(cursor, previous)
+
+
+@receiver(connection_created)
+def restore_search_path(sender, connection, **kwargs):
+    """Keep the active schema when the default connection reconnects."""
+    schema = _active_schema.get()
+    if schema and connection.alias == DEFAULT_DB_ALIAS:
+        with connection.cursor() as cursor:
+            _set_search_path(cursor, schema)
+
+
+def migrate_schema(schema, verbosity=0):
+    """Create ``schema`` if needed and apply the migrations of ``TENANT_APPS``."""
+    quote_name = connection.ops.quote_name
+    alias = f"office_schema_{schema}"
+    settings_dict = dict(connections[DEFAULT_DB_ALIAS].settings_dict)
+    settings_dict["OPTIONS"] = {
+        **settings_dict["OPTIONS"],
+        "options": f"-c search_path={schema},public",
+    }
+    settings_dict[SCHEMA_SETTING] = schema
+    connections.settings[alias] = settings_dict
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {quote_name(schema)}")
+            # Otherwise the recorder would use public.django_migrations, which
+            # is visible through the search path, and skip every migration.
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {quote_name(schema)}.django_migrations "
+                "(LIKE public.django_migrations INCLUDING ALL)"
+            )
+        call_command("migrate", database=alias, interactive=False, verbosity=verbosity)
+    finally:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
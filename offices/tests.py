@@ -0,0 +1,187 @@
+from datetime import timedelta
+
+from bookings.models import Booking
+from django.contrib.auth.models import User
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from jobs.models import Job
+from jobs.queue import run_pending
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.views import TokenObtainPairView
+from rooms.models import Room
+
+from .models import Membership, Office
+from .schemas import migrate_schema, use_schema
+from .tenancy import OFFICE_CLAIM, SCHEMA_CLAIM
+from .tokens import OfficeTokenObtainPairSerializer
+
+
+def slot(hours):
+    start = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(
+        days=1, hours=hours
+    )
+    return {"start": start.isoformat(), "end": (start + timedelta(hours=1)).isoformat()}
+
+
+class OfficeTestMixin:
+    def member(self, username, office, **kwargs):
+        user = User.objects.create_user(username, password="pass", **kwargs)
+        if office is not None:
+            Membership.objects.create(user=user, office=office)
+        return user
+
+    def login(self, user):
+        token = OfficeTokenObtainPairSerializer.get_token(user).access_token
+        self.client.force_authenticate(user=user, token=token)
+
+
+class OfficeTokenTests(OfficeTestMixin, APITestCase):
+    def obtain_token(self, username):
+        # The login view's serializer, without spending anonymous throttle.
+        serializer_class = TokenObtainPairView().get_serializer_class()
+        serializer = serializer_class(data={"username": username, "password": "pass"})
+        serializer.is_valid(raise_exception=True)
+        return AccessToken(serializer.validated_data["access"])
+
+    def test_login_token_carries_office(self):
+        office = Office.objects.create(name="Berlin", slug="berlin", schema="berlin")
+        self.member("alice", office)
+        token = self.obtain_token("alice")
+        self.assertEqual(token[OFFICE_CLAIM], office.pk)
+        self.assertEqual(token[SCHEMA_CLAIM], "berlin")
+
+    def test_user_without_office(self):
+        self.member("bob", None)
+        token = self.obtain_token("bob")
+        self.assertIsNone(token[OFFICE_CLAIM])
+        self.assertEqual(token[SCHEMA_CLAIM], "")
+
+
+class OfficeScopingTests(OfficeTestMixin, APITestCase):
+    def setUp(self):
+        self.berlin = Office.objects.create(name="Berlin", slug="berlin")
+        self.paris = Office.objects.create(name="Paris", slug="paris")
+        self.berlin_room = Room.objects.create(
+            office=self.berlin, name="Room A", capacity=4, floor=1
+        )
+        self.paris_room = Room.objects.create(
+            office=self.paris, name="Room A", capacity=4, floor=1
+        )
+        self.default_room = Room.objects.create(name="Room A", capacity=4, floor=1)
+        self.alice = self.member("alice", self.berlin)
+        self.pierre = self.member("pierre", self.paris)
+
+    def test_rooms_are_listed_per_office(self):
+        self.login(self.alice)
+        response = self.client.get(reverse("room-list"))
+        self.assertEqual([room["id"] for room in response.data], [self.berlin_room.id])
+        response = self.client.get(reverse("room-detail", args=[self.paris_room.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_default_office(self):
+        self.login(self.member("bob", None))
+        response = self.client.get(reverse("room-list"))
+        self.assertEqual([room["id"] for room in response.data], [self.default_room.id])
+        response = self.client.post(
+            reverse("booking-list"), {"room": self.default_room.id, **slot(1)}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(Booking.objects.get().office_id)
+
+    def test_available_ignores_other_offices(self):
+        Booking.objects.create(user=self.pierre, room=self.paris_room, **slot(1))
+        self.login(self.alice)
+        response = self.client.get(reverse("room-available"), slot(1))
+        self.assertEqual([room["id"] for room in response.data], [self.berlin_room.id])
+
+    def test_booking_in_other_office_rejected(self):
+        self.login(self.alice)
+        response = self.client.post(
+            reverse("booking-list"), {"room": self.paris_room.id, **slot(1)}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("room", response.data)
+        response = self.client.post(
+            reverse("booking-list"), {"room": self.berlin_room.id, **slot(1)}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Booking.objects.get().office_id, self.berlin.pk)
+
+    def test_staff_see_their_office_only(self):
+        Booking.objects.create(user=self.alice, room=self.berlin_room, **slot(1))
+        paris_booking = Booking.objects.create(
+            user=self.pierre, room=self.paris_room, **slot(1)
+        )
+        self.login(self.member("admin", self.paris, is_staff=True))
+        response = self.client.get(reverse("booking-list"))
+        self.assertEqual(
+            [booking["id"] for booking in response.data], [paris_booking.id]
+        )
+
+    def test_room_names_are_unique_per_office(self):
+        self.login(self.member("admin", self.berlin, is_staff=True))
+        payload = {"name": "Room A", "capacity": 2, "floor": 3}
+        response = self.client.post(reverse("room-list"), payload)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(reverse("room-list"), {**payload, "name": "Room B"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Room.objects.get(pk=response.data["id"]).office, self.berlin)
+
+
+class OfficeSchemaTests(OfficeTestMixin, APITestCase):
+    SCHEMA = "office_test"
+
+    @classmethod
+    def setUpClass(cls):
+        # Outside the test transaction: migrating uses its own connection.
+        migrate_schema(cls.SCHEMA)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA {cls.SCHEMA} CASCADE")
+
+    def setUp(self):
+        self.office = Office.objects.create(
+            name="Lyon", slug="lyon", schema=self.SCHEMA
+        )
+        self.admin = self.member("admin", self.office, is_staff=True)
+        self.login(self.admin)
+
+    def test_rooms_and_bookings_live_in_office_schema(self):
+        response = self.client.post(
+            reverse("room-list"), {"name": "Room A", "capacity": 2, "floor": 1}
+        )
+        self.assertEqual(response.status_code, 201)
+        room_id = response.data["id"]
+        response = self.client.post(
+            reverse("booking-list"), {"room": room_id, **slot(1)}
+        )
+        self.assertEqual(response.status_code, 201)
+
+        self.assertFalse(Room.objects.exists())
+        self.assertFalse(Booking.objects.exists())
+        with use_schema(self.SCHEMA):
+            self.assertEqual(Booking.objects.get().room_id, room_id)
+        self.assertEqual(
+            [room["id"] for room in self.client.get(reverse("room-list")).data],
+            [room_id],
+        )
+
+    def test_jobs_run_in_office_schema(self):
+        response = self.client.post(
+            reverse("room-list"), {"name": "Room A", "capacity": 2, "floor": 1}
+        )
+        response = self.client.delete(
+            reverse("room-detail", args=[response.data["id"]])
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Job.objects.get().schema, self.SCHEMA)
+        run_pending()
+        self.assertEqual(Job.objects.get().status, Job.Status.DONE)
+        with use_schema(self.SCHEMA):
+            self.assertFalse(Room.objects.exists())
@@ -0,0 +1,13 @@
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from .tenancy import OFFICE_CLAIM, SCHEMA_CLAIM, user_office
+
+
+class OfficeTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Adds the user's office and its schema to the token claims."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[OFFICE_CLAIM], token[SCHEMA_CLAIM] = user_office(user)
+        return token
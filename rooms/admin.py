@@ -1,10 +1,16 @@
 from django.contrib import admin
+from meetingroom_api.pagination import EstimatedCountPaginator
 
 from .models import Room
 
 
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
-    list_display = ("name", "capacity", "floor")
+    list_display = ("name", "office", "capacity", "floor", "timezone")
+    list_select_related = ("office",)
+    # Also used by the room autocompletes of the booking admins.
     search_fields = ("name",)
-    list_filter = ("floor", "capacity")
+    list_filter = ("office", "floor", "capacity")
+    ordering = ("name", "id")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
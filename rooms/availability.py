@@ -0,0 +1,58 @@
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate
+
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import Q
+
+from bookings.models import Booking
+
+
+class BusyIndex:
+    """
+    Sorted booked periods per room with running maximum end times, answering
+    "is this room free in this period" with one bisect.
+    """
+
+    def __init__(self, intervals):
+        grouped = defaultdict(list)
+        for room_id, start, end in intervals:
+            grouped[room_id].append((start, end))
+        self.starts = {}
+        self.max_ends = {}
+        for room_id, booked in grouped.items():
+            booked.sort()
+            self.starts[room_id] = [start for start, _ in booked]
+            self.max_ends[room_id] = list(accumulate((end for _, end in booked), max))
+
+    def is_free(self, room_id, start, end):
+        starts = self.starts.get(room_id)
+        if not starts:
+            return True
+        # Bookings starting before the period ends; free unless one of them
+        # ends after the period starts.
+        before = bisect_left(starts, end)
+        return before == 0 or self.max_ends[room_id][before - 1] <= start
+
+
+def merge_periods(periods):
+    """Merge overlapping or touching ``(start, end)`` pairs."""
+    merged = []
+    for start, end in sorted(periods):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def busy_index(rooms, periods):
+    """
+    Build a ``BusyIndex`` for ``rooms`` covering all ``periods`` with a single
+    query over ``Booking``, one ``&&`` condition per disjoint period.
+    """
+    condition = Q()
+    for start, end in merge_periods(periods):
+        condition |= Q(period__overlap=DateTimeTZRange(start, end))
+    bookings = Booking.objects.filter(room__in=rooms).with_period().filter(condition)
+    return BusyIndex(bookings.values_list("room_id", "start", "end"))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:17
+
+from django.db import migrations, models
+import rooms.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="room",
+            name="timezone",
+            field=models.CharField(
+                default="UTC",
+                max_length=64,
+                validators=[rooms.models.validate_timezone],
+            ),
+        ),
+    ]
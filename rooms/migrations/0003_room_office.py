@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("offices", "0001_initial"),
+        ("rooms", "0002_room_timezone"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="room",
+            name="office",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="rooms",
+                to="offices.office",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="room",
+            name="name",
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(
+                fields=["office", "floor", "capacity"],
+                name="rooms_room_office__349102_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="room",
+            constraint=models.UniqueConstraint(
+                fields=("office", "name"), name="unique_office_room_name"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="room",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("office__isnull", True)),
+                fields=("name",),
+                name="unique_default_office_room_name",
+            ),
+        ),
+    ]
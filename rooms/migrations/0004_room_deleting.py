@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0003_room_office"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="room",
+            name="deleting",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -1,10 +1,53 @@
+import zoneinfo
+
+from django.core.exceptions import ValidationError
 from django.db import models
 
 
+def validate_timezone(value):
+    try:
+        zoneinfo.ZoneInfo(value)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f"Unknown time zone {value!r}.")
+
+
 class Room(models.Model):
-    name = models.CharField(max_length=100, unique=True)
+    # Null for rooms of the default office.
+    office = models.ForeignKey(
+        "offices.Office",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="rooms",
+        # Covered by the office-leading indexes below.
+        db_index=False,
+    )
+    name = models.CharField(max_length=100)
     capacity = models.PositiveIntegerField()
     floor = models.IntegerField()
+    timezone = models.CharField(
+        max_length=64, default="UTC", validators=[validate_timezone]
+    )
+    # Set while a ``rooms.delete`` job removes the room: it is hidden from the
+    # API and takes no new bookings or waitlist entries.
+    deleting = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["office", "name"], name="unique_office_room_name"
+            ),
+            models.UniqueConstraint(
+                fields=["name"],
+                condition=models.Q(office__isnull=True),
+                name="unique_default_office_room_name",
+            ),
+        ]
+        indexes = [models.Index(fields=["office", "floor", "capacity"])]
 
     def __str__(self):
         return f"{self.name} (Floor {self.floor}, Capacity {self.capacity})"
+
+    @property
+    def tzinfo(self):
+        return zoneinfo.ZoneInfo(self.timezone)
@@ -6,4 +6,40 @@ from .models import Room
 class RoomSerializer(serializers.ModelSerializer):
     class Meta:
         model = Room
-        fields = ["id", "name", "capacity", "floor"]
+        fields = ["id", "name", "capacity", "floor", "timezone"]
+
+    def validate_name(self, value):
+        # Names are unique within an office; see Room.Meta.constraints.
+        rooms = Room.objects.filter(office_id=self.context.get("office_id"), name=value)
+        if self.instance is not None:
+            rooms = rooms.exclude(pk=self.instance.pk)
+        if rooms.exists():
+            raise serializers.ValidationError("room with this name already exists.")
+        return value
+
+
+class AvailabilityWindowSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+
+    def validate(self, attrs):
+        # An end_time before start_time ends on the next day; see local_period.
+        if attrs["start_time"] == attrs["end_time"]:
+            raise serializers.ValidationError("start_time must differ from end_time.")
+        return attrs
+
+
+class BatchAvailabilitySerializer(serializers.Serializer):
+    MAX_WINDOWS = 100
+
+    windows = AvailabilityWindowSerializer(many=True, allow_empty=False)
+    capacity = serializers.IntegerField(required=False)
+    floor = serializers.IntegerField(required=False)
+
+    def validate_windows(self, windows):
+        if len(windows) > self.MAX_WINDOWS:
+            raise serializers.ValidationError(
+                f"Ensure this field has no more than {self.MAX_WINDOWS} windows."
+            )
+        return windows
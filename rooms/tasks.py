@@ -0,0 +1,18 @@
+from bookings.models import Booking, WaitlistEntry
+from bookings.tasks import DELETE_BATCH_SIZE, delete_bookings
+from jobs.queue import register
+
+from .models import Room
+
+
+@register("rooms.delete")
+def delete_room(job):
+    room_id = job.payload["room_id"]
+    WaitlistEntry.objects.filter(room_id=room_id).delete()
+    deleted = delete_bookings(
+        Booking.objects.filter(room_id=room_id),
+        job.payload.get("batch_size", DELETE_BATCH_SIZE),
+        job,
+    )
+    Room.objects.filter(pk=room_id).delete()
+    return {"deleted_bookings": deleted}
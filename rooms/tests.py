@@ -1,11 +1,17 @@
-from datetime import date, time
+from datetime import date, time, timedelta
 
 from bookings.models import Booking
+from bookings.tests import period
 from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.urls import reverse
+from meetingroom_api.fastpath import values_serializer_for
+from offices.tokens import OfficeTokenObtainPairSerializer
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 
 from .models import Room
+from .serializers import RoomSerializer
 
 
 class RoomAPITests(APITestCase):
@@ -30,6 +36,7 @@ class RoomAPITests(APITestCase):
             "name": "Room A",
             "capacity": 1,
             "floor": 1,
+            "timezone": "UTC",
             "id": self.room1.id,
         }
         # Access the endpoint as regular user
@@ -74,10 +81,46 @@ class RoomAPITests(APITestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.delete(url)
         self.assertEqual(response.status_code, 403)
-        # Admin can delete
+        # Admin can delete; the cascade runs as a background job
+        Booking.objects.create(
+            user=self.user,
+            room=self.room1,
+            **period(date.today(), time(10, 0), time(11, 0)),
+        )
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["name"], "rooms.delete")
+        self.assertTrue(Room.objects.filter(id=self.room1.id).exists())
+        call_command("run_workers", "--burst", verbosity=0)
+        self.assertFalse(Room.objects.filter(id=self.room1.id).exists())
+        self.assertFalse(Booking.objects.filter(room_id=self.room1.id).exists())
+        response = self.client.get(reverse("job-detail", args=[response.data["id"]]))
+        self.assertEqual(response.data["status"], "done")
+        self.assertEqual(response.data["result"], {"deleted_bookings": 1})
+
+    def test_room_being_deleted_is_hidden_and_closed(self):
+        url = reverse("room-detail", args=[self.room1.id])
         self.client.force_authenticate(user=self.admin)
+        job_id = self.client.delete(url).data["id"]
         response = self.client.delete(url)
-        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["id"], job_id)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse("room-list"))
+        self.assertEqual(
+            {room["id"] for room in response.data}, {self.room2.id, self.room3.id}
+        )
+        self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.post(
+            reverse("booking-list"),
+            {"room": self.room1.id, **period(date.today(), time(10), time(11))},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("room", response.data)
+
+        call_command("run_workers", "--burst", verbosity=0)
         self.assertFalse(Room.objects.filter(id=self.room1.id).exists())
 
     def test_available_rooms(self):
@@ -111,9 +154,7 @@ class RoomAPITests(APITestCase):
         Booking.objects.create(
             user=self.user,
             room=self.room1,
-            date=booking_date,
-            start_time=time(10, 0),
-            end_time=time(11, 0),
+            **period(booking_date, time(10, 0), time(11, 0)),
         )
         response = self.client.get(url, params)
         self.assertEqual(response.status_code, 200)
@@ -146,9 +187,7 @@ class RoomAPITests(APITestCase):
         Booking.objects.create(
             user=self.user,
             room=self.room1,
-            date=booking_date,
-            start_time=time(10, 0),
-            end_time=time(11, 0),
+            **period(booking_date, time(10, 0), time(11, 0)),
         )
         response = self.client.get(url, params)
         self.assertEqual(response.status_code, 200)
@@ -176,3 +215,204 @@ class RoomAPITests(APITestCase):
         response = self.client.get(url, params)
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["name"], "Room B")
+
+    def test_available_rooms_in_room_time_zone(self):
+        self.room2.timezone = "Asia/Tokyo"
+        self.room2.save()
+        # 10:00-11:00 in Tokyo.
+        Booking.objects.create(
+            user=self.user,
+            room=self.room2,
+            **period(date(2025, 5, 1), time(1), time(2)),
+        )
+        self.client.force_authenticate(user=self.user)
+        url = reverse("room-available")
+        params = {"floor": 1, "date": "2025-05-01", "start_time": "10:00", "end_time": "11:00"}
+        response = self.client.get(url, params)
+        self.assertEqual([r["name"] for r in response.data], ["Room A"])
+
+        params = {"floor": 1, "start": "2025-05-01T01:30:00Z", "end": "2025-05-01T03:00:00Z"}
+        response = self.client.get(url, params)
+        self.assertEqual([r["name"] for r in response.data], ["Room A"])
+        params["start"] = "2025-05-01T02:00:00Z"
+        response = self.client.get(url, params)
+        self.assertEqual([r["name"] for r in response.data], ["Room A", "Room B"])
+        response = self.client.get(url, {"start": "tomorrow", "end": "2025-05-01T03:00:00Z"})
+        self.assertEqual(response.status_code, 400)
+
+
+class RoomValuesSerializerTests(APITestCase):
+    def test_output_matches_model_serializer(self):
+        for i in range(5):
+            Room.objects.create(name=f"Room {i}", capacity=i + 1, floor=i % 2)
+        rooms = Room.objects.order_by("id")
+        values_serializer = values_serializer_for(RoomSerializer)
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(values_serializer.to_representation(values_serializer.values(rooms))),
+            renderer.render(RoomSerializer(rooms, many=True).data),
+        )
+
+    def test_list_response_matches_model_serializer(self):
+        Room.objects.create(name="Room A", capacity=3, floor=1)
+        Room.objects.create(name="Room B", capacity=5, floor=2)
+        response = self.client.get(reverse("room-list"))
+        self.assertEqual(
+            response.content,
+            JSONRenderer().render(
+                RoomSerializer(Room.objects.order_by("id"), many=True).data
+            ),
+        )
+
+
+class RoomAnalyticsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("user", "user@test.com", "pass")
+        self.room1 = Room.objects.create(name="Room A", capacity=1, floor=1)
+        self.room2 = Room.objects.create(name="Room B", capacity=1, floor=1)
+        self.room3 = Room.objects.create(name="Room C", capacity=1, floor=2)
+        for room, day, start, end in [
+            (self.room1, date(2025, 5, 5), time(9), time(10)),
+            (self.room2, date(2025, 5, 6), time(9, 30), time(11)),
+            (self.room3, date(2025, 5, 6), time(14), time(15)),
+            (self.room1, date(2025, 5, 12), time(16), time(16, 30)),
+        ]:
+            Booking.objects.create(user=self.user, room=room, **period(day, start, end))
+        self.url = reverse("room-analytics")
+        token = OfficeTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.force_authenticate(user=self.user, token=token)
+
+    def test_group_by_floor_per_week(self):
+        params = {"date_from": "2025-05-01", "date_to": "2025-05-31"}
+        # One query for the rollups and one for room counts, summed in SQL.
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.url, {"group_by": "floor", "period": "week", **params}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [
+                (r["floor"], r["period_start"], r["booked_minutes"], r["booking_count"], r["peak_hour"])
+                for r in response.data
+            ],
+            [
+                (1, "2025-05-05", 150, 2, 9),
+                (2, "2025-05-05", 60, 1, 14),
+                (1, "2025-05-12", 30, 1, 16),
+            ],
+        )
+        self.assertEqual(response.data[0]["utilization"], round(150 / (2 * 7 * 24 * 60), 4))
+
+    def test_group_by_room_per_day_with_date_range(self):
+        params = {"period": "day", "date_from": "2025-05-06", "date_to": "2025-05-06"}
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(r["room"], r["booked_minutes"]) for r in response.data],
+            [(self.room2.id, 90), (self.room3.id, 60)],
+        )
+
+    def test_invalid_parameters(self):
+        response = self.client.get(self.url, {"group_by": "building"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {"period": "year"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {"date_from": "05/06/2025"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            self.url, {"date_from": "2025-05-07", "date_to": "2025-05-06"}
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            self.url, {"date_from": "2024-01-01", "date_to": "2025-05-06"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_defaults_to_last_30_days(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [])
+        response = self.client.get(self.url, {"date_to": "2025-05-31"})
+        self.assertEqual(len(response.data), 4)
+
+
+class RoomBatchAvailabilityTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("user", "user@test.com", "pass")
+        self.room1 = Room.objects.create(name="Room A", capacity=1, floor=1)
+        self.room2 = Room.objects.create(name="Room B", capacity=1, floor=1)
+        self.room3 = Room.objects.create(name="Room C", capacity=1, floor=2)
+        self.day = date(2025, 5, 5)
+        for room, start, end in [
+            (self.room1, time(9), time(10)),
+            (self.room1, time(10), time(12)),
+            (self.room2, time(11), time(11, 30)),
+        ]:
+            Booking.objects.create(
+                user=self.user, room=room, **period(self.day, start, end)
+            )
+        self.url = reverse("room-available-batch")
+
+    def test_free_rooms_per_window_in_two_queries(self):
+        windows = [
+            {"date": "2025-05-05", "start_time": "08:00", "end_time": "09:00"},
+            {"date": "2025-05-05", "start_time": "09:30", "end_time": "10:30"},
+            {"date": "2025-05-05", "start_time": "11:15", "end_time": "13:00"},
+            {"date": "2025-05-05", "start_time": "12:00", "end_time": "13:00"},
+            {"date": "2025-05-06", "start_time": "10:00", "end_time": "11:00"},
+        ]
+        # With the office claims of a login token, as in production.
+        token = OfficeTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.force_authenticate(user=self.user, token=token)
+        # One query for the rooms and one for the bookings of all windows
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                self.url, {"windows": windows, "floor": 1}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [[room["name"] for room in result["rooms"]] for result in response.data],
+            [
+                ["Room A", "Room B"],
+                ["Room B"],
+                [],
+                ["Room A", "Room B"],
+                ["Room A", "Room B"],
+            ],
+        )
+        self.assertEqual(response.data[0]["start_time"], "08:00:00")
+        # Same answer as the single-window endpoint
+        for window, result in zip(windows, response.data):
+            single = self.client.get(reverse("room-available"), {**window, "floor": 1})
+            self.assertEqual(
+                sorted(room["id"] for room in single.data),
+                [room["id"] for room in result["rooms"]],
+            )
+
+    def test_invalid_windows(self):
+        response = self.client.post(self.url, {"windows": []}, format="json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            self.url,
+            {"windows": [{"date": "2025-05-05", "start_time": "11:00", "end_time": "11:00"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_overnight_window(self):
+        Booking.objects.create(
+            user=self.user,
+            room=self.room2,
+            **period(self.day + timedelta(days=1), time(1), time(3)),
+        )
+        window = {"date": "2025-05-05", "start_time": "22:00", "end_time": "02:00"}
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            self.url, {"windows": [window], "floor": 1}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [room["name"] for room in response.data[0]["rooms"]], ["Room A"]
+        )
+        single = self.client.get(reverse("room-available"), {**window, "floor": 1})
+        self.assertEqual([room["name"] for room in single.data], ["Room A"])
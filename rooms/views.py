@@ -1,15 +1,33 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
 from rest_framework import filters, permissions, viewsets
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
-from bookings.models import Booking
+from bookings.calendar import ICalendarRenderer
+from bookings.models import Booking, local_period
+from bookings.usage import GROUPS, PERIODS, occupancy
+from bookings.views import calendar_response
+from jobs.models import Job
+from jobs.queue import enqueue
+from jobs.serializers import JobSerializer
+from meetingroom_api.fastpath import ValuesListMixin
+from meetingroom_api.schema import schema
+from offices.schemas import active_schema
+from offices.tenancy import OfficeScopedMixin
+from .availability import busy_index
 from .models import Room
-from .serializers import RoomSerializer
+from .serializers import BatchAvailabilitySerializer, RoomSerializer
+
+
+ANALYTICS_DEFAULT_DAYS = 30
+ANALYTICS_MAX_DAYS = 366
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -19,21 +37,54 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return request.user and request.user.is_staff
 
 
-class RoomViewSet(viewsets.ModelViewSet):
-    queryset = Room.objects.all()
+class RoomViewSet(OfficeScopedMixin, ValuesListMixin, viewsets.ModelViewSet):
     serializer_class = RoomSerializer
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ["name"]
     filterset_fields = ["capacity", "floor"]
 
-    @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter('date', openapi.IN_QUERY, description="Date in YYYY-MM-DD", type=openapi.TYPE_STRING, required=False),
-            openapi.Parameter('start_time', openapi.IN_QUERY, description="Start time in HH:MM", type=openapi.TYPE_STRING, required=False),
-            openapi.Parameter('end_time', openapi.IN_QUERY, description="End time in HH:MM", type=openapi.TYPE_STRING, required=False),
-            openapi.Parameter('capacity', openapi.IN_QUERY, description="Room capacity", type=openapi.TYPE_INTEGER, required=False),
-            openapi.Parameter('floor', openapi.IN_QUERY, description="Room floor", type=openapi.TYPE_INTEGER, required=False),
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Room.objects.none()
+        rooms = Room.objects.filter(office_id=self.office_id)
+        if self.action == "destroy":
+            # Repeated deletes return the job already deleting the room.
+            return rooms
+        return rooms.filter(deleting=False)
+
+    def perform_create(self, serializer):
+        serializer.save(office_id=self.office_id)
+
+    def destroy(self, request, *args, **kwargs):
+        # Cascading through the room's bookings can take long; run it as a job.
+        room = self.get_object()
+        with transaction.atomic():
+            # Locks the room like booking writes, which then see the flag.
+            Room.objects.filter(pk=room.pk).update(deleting=True)
+            job = (
+                Job.objects.filter(
+                    name="rooms.delete",
+                    payload__room_id=room.pk,
+                    schema=active_schema(),
+                    status__in=[Job.Status.PENDING, Job.Status.RUNNING],
+                )
+                .order_by("id")
+                .first()
+            )
+            if job is None:
+                job = enqueue("rooms.delete", {"room_id": room.pk}, user=request.user)
+        return Response(JobSerializer(job).data, status=202)
+
+    @schema(
+        query_parameters=[
+            ("date", "string", "Date in YYYY-MM-DD"),
+            ("start_time", "string", "Start time in HH:MM"),
+            ("end_time", "string", "End time in HH:MM"),
+            ("start", "string", "Start as an ISO 8601 datetime, instead of date/start_time/end_time"),
+            ("end", "string", "End as an ISO 8601 datetime"),
+            ("capacity", "integer", "Room capacity"),
+            ("floor", "integer", "Room floor"),
         ]
     )
     @action(detail=False, methods=["get"], url_path="available")
@@ -69,21 +120,156 @@ class RoomViewSet(viewsets.ModelViewSet):
                     {"detail": "Invalid end_time format. Use HH:MM."}, status=400
                 )
 
-        rooms = Room.objects.all()
+        period = {}
+        for param in ("start", "end"):
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    period[param] = parse_datetime(value)
+                except ValueError:
+                    period[param] = None
+                if period[param] is None:
+                    return Response(
+                        {"detail": f"Invalid {param} format. Use ISO 8601."},
+                        status=400,
+                    )
+                if timezone.is_naive(period[param]):
+                    period[param] = timezone.make_aware(period[param])
+
+        rooms = self.get_queryset()
         if capacity:
             rooms = rooms.filter(capacity=capacity)
         if floor:
             rooms = rooms.filter(floor=floor)
 
-        if date and start_time and end_time:
-            overlapping_bookings = Booking.objects.filter(
-                date=date, start_time__lt=end_time, end_time__gt=start_time
+        if "start" in period and "end" in period:
+            booked = Booking.objects.filter(office_id=self.office_id).overlapping(
+                period["start"], period["end"]
             )
-            booked_room_ids = list(
-                overlapping_bookings.values_list("room_id", flat=True)
+            rooms = rooms.exclude(id__in=booked.values("room_id"))
+        elif date and start_time and end_time:
+            # The window is wall-clock time in each room's time zone.
+            timezones = set(rooms.values_list("timezone", flat=True))
+            booked = Booking.objects.filter(
+                office_id=self.office_id
+            ).overlapping_local(date, start_time, end_time, timezones)
+            rooms = rooms.exclude(id__in=booked.values("room_id"))
+
+        return self.get_values_response(rooms)
+
+    @schema(request_body=BatchAvailabilitySerializer)
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="available/batch",
+        permission_classes=[permissions.AllowAny],
+    )
+    def available_batch(self, request):
+        """
+        Free rooms for each of several date/time windows, computed from one
+        range query over bookings instead of one query per window.
+        """
+        serializer = BatchAvailabilitySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        windows = serializer.validated_data["windows"]
+
+        rooms = self.get_queryset().order_by("id")
+        for param in ("capacity", "floor"):
+            if param in serializer.validated_data:
+                rooms = rooms.filter(**{param: serializer.validated_data[param]})
+        values_serializer = self.get_values_serializer()
+        room_rows = values_serializer.to_representation(values_serializer.values(rooms))
+        # Windows are wall-clock time in each room's time zone.
+        periods = {
+            (i, tz): local_period(
+                window["date"], window["start_time"], window["end_time"], ZoneInfo(tz)
             )
-            rooms = rooms.exclude(id__in=booked_room_ids)
+            for i, window in enumerate(windows)
+            for tz in {room["timezone"] for room in room_rows}
+        }
+        busy = busy_index(rooms, periods.values())
+
+        results = []
+        for i, window in enumerate(windows):
+            results.append(
+                {
+                    "date": window["date"].isoformat(),
+                    "start_time": window["start_time"].isoformat(),
+                    "end_time": window["end_time"].isoformat(),
+                    "rooms": [
+                        room
+                        for room in room_rows
+                        if busy.is_free(room["id"], *periods[(i, room["timezone"])])
+                    ],
+                }
+            )
+        return Response(results)
+
+    @schema(
+        query_parameters=[
+            ("group_by", "string", "room or floor"),
+            ("period", "string", "day, week or month"),
+            ("date_from", "string", "Date in YYYY-MM-DD, 30 days up to date_to by default"),
+            ("date_to", "string", "Date in YYYY-MM-DD, today by default"),
+        ]
+    )
+    @action(detail=False, methods=["get"], url_path="analytics")
+    def analytics(self, request):
+        group_by = request.query_params.get("group_by", "room")
+        if group_by not in GROUPS:
+            return Response(
+                {"detail": f"Invalid group_by. Use one of: {', '.join(GROUPS)}."},
+                status=400,
+            )
+        period = request.query_params.get("period", "day")
+        if period not in PERIODS:
+            return Response(
+                {"detail": f"Invalid period. Use one of: {', '.join(PERIODS)}."},
+                status=400,
+            )
+        dates = {}
+        for param in ("date_from", "date_to"):
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    dates[param] = datetime.strptime(value, "%Y-%m-%d").date()
+                except ValueError:
+                    return Response(
+                        {"detail": f"Invalid {param} format. Use YYYY-MM-DD."},
+                        status=400,
+                    )
+        # Bounded so that a request reads a bounded slice of the rollups.
+        date_to = dates.get("date_to") or timezone.localdate()
+        date_from = dates.get("date_from") or date_to - timedelta(
+            days=ANALYTICS_DEFAULT_DAYS - 1
+        )
+        if date_from > date_to:
+            return Response(
+                {"detail": "date_from must not be after date_to."}, status=400
+            )
+        if (date_to - date_from).days >= ANALYTICS_MAX_DAYS:
+            return Response(
+                {"detail": f"Date range is limited to {ANALYTICS_MAX_DAYS} days."},
+                status=400,
+            )
+
+        rooms = self.filter_queryset(self.get_queryset())
+        return Response(occupancy(rooms, group_by, period, date_from, date_to))
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="calendar.ics",
+        renderer_classes=[ICalendarRenderer, JSONRenderer],
+    )
+    def calendar(self, request, pk=None):
+        room = self.get_object()
+        user = request.user
+
+        def summary(row):
+            # Other users' bookings are only shown as busy time.
+            if user.is_staff or row[5] == user.id:
+                return f"Booked by {row[6]}"
+            return "Busy"
 
-        rooms = rooms.prefetch_related("bookings")
-        serializer = self.get_serializer(rooms, many=True)
-        return Response(serializer.data)
+        return calendar_response(room.bookings.all(), request, room.name, summary)